@@ -5,7 +5,7 @@ Location: backend/api/prediction_endpoints.py
 import numpy as np
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
 from fastapi.responses import JSONResponse, StreamingResponse
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field, field_validator
 import logging
@@ -185,6 +185,9 @@ async def predict_fire_spread(
         if location_data.get('nearby_fires'):
             warnings.append(f"Active fires detected within {request.radius_km}km")
 
+        if prediction_result.get('status') == 'degraded':
+            warnings.append(f"{prediction_result['failed_models']} ensemble models failed")
+
         response = PredictionResponse(
             prediction_id=prediction_id,
             status="completed",
@@ -194,7 +197,7 @@ async def predict_fire_spread(
                 'longitude': request.location.longitude,
                 'radius_km': request.radius_km
             },
-            predictions=prediction_result.get('predictions', []),
+            predictions=_json_ready(prediction_result.get('predictions', [])),
             metadata={
                 'model_type': request.model_type,
                 'execution_time': execution_time,
@@ -368,9 +371,10 @@ async def predict_area_fire_risk(
         }
 
         # Prepare wind conditions
+        wind_speed_matrix, wind_direction_matrix = _create_wind_matrices(area_data.get('weather', {}), grid_size, bounds)
         wind_conditions = WindConditions(
-            speed_matrix=_create_wind_speed_matrix(area_data.get('weather', {}), grid_size, bounds),
-            direction_matrix=_create_wind_direction_matrix(area_data.get('weather', {}), grid_size, bounds),
+            speed_matrix=wind_speed_matrix,
+            direction_matrix=wind_direction_matrix,
             turbulence=area_data.get('weather', {}).get('turbulence_intensity', 0.5)
         )
 
@@ -396,6 +400,10 @@ async def predict_area_fire_risk(
         # Store prediction result
         execution_time = (datetime.now() - start_time).total_seconds()
 
+        # Low / medium / high risk classes (<= 0.4, <= 0.7, > 0.7) in one pass
+        risk_classes = np.digitize(risk_map, [0.4, 0.7], right=True)
+        risk_class_percentages = np.bincount(risk_classes.ravel(), minlength=3) / risk_map.size * 100
+
         prediction_result = {
             'prediction_id': prediction_id,
             'status': 'completed',
@@ -404,9 +412,9 @@ async def predict_area_fire_risk(
             'grid_size': grid_size,
             'risk_map': risk_map.tolist(),
             'risk_statistics': {
-                'high_risk_percentage': float(np.sum(risk_map > 0.7) / risk_map.size * 100),
-                'medium_risk_percentage': float(np.sum((risk_map > 0.4) & (risk_map <= 0.7)) / risk_map.size * 100),
-                'low_risk_percentage': float(np.sum(risk_map <= 0.4) / risk_map.size * 100),
+                'high_risk_percentage': float(risk_class_percentages[2]),
+                'medium_risk_percentage': float(risk_class_percentages[1]),
+                'low_risk_percentage': float(risk_class_percentages[0]),
                 'max_risk_value': float(np.max(risk_map)),
                 'mean_risk_value': float(np.mean(risk_map))
             },
@@ -464,25 +472,35 @@ def _create_fire_state_grid(fire_data: Dict, grid_size: int, bounds: Dict) -> np
     grid = np.zeros((grid_size, grid_size))
 
     active_fires = fire_data.get('active_fires', [])
-
-    for fire in active_fires:
-        # Convert lat/lon to grid coordinates
-        i = int((fire['center_lat'] - bounds['south']) / (bounds['north'] - bounds['south']) * (grid_size - 1))
-        j = int((fire['center_lon'] - bounds['west']) / (bounds['east'] - bounds['west']) * (grid_size - 1))
-
-        if 0 <= i < grid_size and 0 <= j < grid_size:
-            # Set fire intensity
-            grid[i, j] = fire.get('intensity', 0.8)
-
-            # Add spread based on fire size
-            radius_cells = int(np.sqrt(fire.get('area_hectares', 10) / 100))
-            for di in range(-radius_cells, radius_cells + 1):
-                for dj in range(-radius_cells, radius_cells + 1):
-                    ni, nj = i + di, j + dj
-                    if 0 <= ni < grid_size and 0 <= nj < grid_size:
-                        distance = np.sqrt(di ** 2 + dj ** 2)
-                        if distance <= radius_cells:
-                            grid[ni, nj] = max(grid[ni, nj], fire.get('intensity', 0.8) * (1 - distance / radius_cells))
+    if not active_fires:
+        return grid
+
+    # Convert lat/lon to grid coordinates for all fires at once
+    lats = np.array([fire['center_lat'] for fire in active_fires], dtype=float)
+    lons = np.array([fire['center_lon'] for fire in active_fires], dtype=float)
+    rows = ((lats - bounds['south']) / (bounds['north'] - bounds['south']) * (grid_size - 1)).astype(int)
+    cols = ((lons - bounds['west']) / (bounds['east'] - bounds['west']) * (grid_size - 1)).astype(int)
+    intensities = [fire.get('intensity', 0.8) for fire in active_fires]
+
+    # Spread radius based on fire size
+    radii = np.sqrt(np.array([fire.get('area_hectares', 10) for fire in active_fires], dtype=float) / 100).astype(int)
+
+    in_grid = (rows >= 0) & (rows < grid_size) & (cols >= 0) & (cols < grid_size)
+    for k in np.flatnonzero(in_grid):
+        i, j, intensity, radius_cells = rows[k], cols[k], intensities[k], radii[k]
+
+        # Set fire intensity
+        grid[i, j] = intensity
+
+        if radius_cells > 0:
+            # Linear falloff over the disc of radius_cells, clipped to the grid
+            row_span = slice(max(i - radius_cells, 0), min(i + radius_cells + 1, grid_size))
+            col_span = slice(max(j - radius_cells, 0), min(j + radius_cells + 1, grid_size))
+            di = np.arange(row_span.start, row_span.stop) - i
+            dj = np.arange(col_span.start, col_span.stop) - j
+            distance = np.sqrt(di[:, None] ** 2 + dj[None, :] ** 2)
+            spread = np.where(distance <= radius_cells, intensity * (1 - distance / radius_cells), -np.inf)
+            np.maximum(grid[row_span, col_span], spread, out=grid[row_span, col_span])
 
     return grid
 
@@ -529,28 +547,23 @@ def _create_temperature_grid(weather_data: Dict, grid_size: int, bounds: Dict) -
     return np.full((grid_size, grid_size), avg_temp + 273.15)  # Convert to Kelvin
 
 
-def _create_wind_speed_matrix(weather_data: Dict, grid_size: int, bounds: Dict) -> np.ndarray:
-    """Create wind speed matrix"""
-    if 'wind_field' in weather_data:
-        wind_field = np.array(weather_data['wind_field'])
-        # Calculate magnitude from u,v components
-        return np.sqrt(wind_field[:, :, 0] ** 2 + wind_field[:, :, 1] ** 2)
-
-        # Default uniform wind
-    avg_wind = weather_data.get('current_conditions', {}).get('avg_wind_speed', 10)
-    return np.full((grid_size, grid_size), avg_wind)
-
-
-def _create_wind_direction_matrix(weather_data: Dict, grid_size: int, bounds: Dict) -> np.ndarray:
-    """Create wind direction matrix"""
+def _create_wind_matrices(weather_data: Dict, grid_size: int, bounds: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Create wind speed and direction matrices from a single read of the wind field"""
     if 'wind_field' in weather_data:
-        wind_field = np.array(weather_data['wind_field'])
-        # Calculate direction from u,v components
-        return np.arctan2(wind_field[:, :, 1], wind_field[:, :, 0])
-
-    # Default uniform direction
-    dominant_dir = weather_data.get('current_conditions', {}).get('dominant_wind_direction', 0)
-    return np.full((grid_size, grid_size), np.radians(dominant_dir))
+        wind_field = np.asarray(weather_data['wind_field'])
+        u_component = wind_field[:, :, 0]
+        v_component = wind_field[:, :, 1]
+        # Calculate magnitude and direction from u,v components
+        return np.sqrt(u_component ** 2 + v_component ** 2), np.arctan2(v_component, u_component)
+
+    # Default uniform wind
+    current_conditions = weather_data.get('current_conditions', {})
+    avg_wind = current_conditions.get('avg_wind_speed', 10)
+    dominant_dir = current_conditions.get('dominant_wind_direction', 0)
+    return (
+        np.full((grid_size, grid_size), avg_wind),
+        np.full((grid_size, grid_size), np.radians(dominant_dir))
+    )
 
 
 def _generate_risk_map(fire_evolution: List[np.ndarray]) -> np.ndarray:
@@ -558,21 +571,24 @@ def _generate_risk_map(fire_evolution: List[np.ndarray]) -> np.ndarray:
     if not fire_evolution:
         return np.zeros((50, 50))
 
-    # Combine all time steps with decay
-    risk_map = np.zeros_like(fire_evolution[0])
+    # Combine all time steps with decay, updating one map in place
+    first_state = np.asarray(fire_evolution[0])
+    risk_map = np.zeros(first_state.shape, dtype=np.result_type(first_state, 1.0))
+    weighted = np.empty_like(risk_map)
 
     for t, fire_state in enumerate(fire_evolution):
         # Later time steps have higher weight (more certain)
-        weight = (t + 1) / len(fire_evolution)
-        risk_map = np.maximum(risk_map, fire_state * weight)
+        np.multiply(fire_state, (t + 1) / len(fire_evolution), out=weighted)
+        np.maximum(risk_map, weighted, out=risk_map)
 
     # Apply spatial smoothing for continuous risk field
     from scipy.ndimage import gaussian_filter
     risk_map = gaussian_filter(risk_map, sigma=1.5)
 
     # Normalize to [0, 1]
-    if np.max(risk_map) > 0:
-        risk_map = risk_map / np.max(risk_map)
+    max_risk = np.max(risk_map)
+    if max_risk > 0:
+        risk_map /= max_risk
 
     return risk_map
 
@@ -587,40 +603,43 @@ def _identify_high_risk_areas_from_map(
     high_risk_areas = []
 
     # Find contiguous high-risk regions
-    from scipy.ndimage import label, center_of_mass
+    from scipy.ndimage import label, center_of_mass, maximum
     high_risk_mask = risk_map > high_risk_threshold
     labeled_array, num_features = label(high_risk_mask)
 
-    for i in range(1, num_features + 1):
-        # Get region properties
-        region_mask = labeled_array == i
-        region_size = np.sum(region_mask)
-
-        if region_size < 4:  # Skip very small regions
-            continue
+    # Region sizes from one pass over the labels, skipping very small regions
+    region_sizes = np.bincount(labeled_array.ravel(), minlength=num_features + 1)
+    region_ids = np.flatnonzero(region_sizes[1:] >= 4) + 1
+    if region_ids.size == 0:
+        return high_risk_areas
 
-        # Calculate center
-        center = center_of_mass(region_mask)
+    # Centers and max risk for all regions at once
+    centers = np.asarray(center_of_mass(high_risk_mask, labeled_array, region_ids)).reshape(-1, 2)
+    max_risks = np.asarray(maximum(risk_map, labeled_array, region_ids))
 
-        # Convert to lat/lon
-        lat = bounds['south'] + (center[0] / risk_map.shape[0]) * (bounds['north'] - bounds['south'])
-        lon = bounds['west'] + (center[1] / risk_map.shape[1]) * (bounds['east'] - bounds['west'])
+    # Convert to lat/lon
+    lats = bounds['south'] + (centers[:, 0] / risk_map.shape[0]) * (bounds['north'] - bounds['south'])
+    lons = bounds['west'] + (centers[:, 1] / risk_map.shape[1]) * (bounds['east'] - bounds['west'])
 
-        # Calculate area
-        area_km2 = region_size * (resolution_km ** 2)
+    # Calculate area
+    areas_km2 = region_sizes[region_ids] * (resolution_km ** 2)
+    risk_levels = np.where(max_risks > 0.9, 'extreme', 'high')
 
-        # Get max risk in region
-        max_risk = np.max(risk_map[region_mask])
-
-        high_risk_areas.append({
+    high_risk_areas = [
+        {
             'id': f'risk_area_{i}',
             'center': {'latitude': lat, 'longitude': lon},
             'area_km2': area_km2,
-            'max_risk_value': float(max_risk),
-            'risk_level': 'extreme' if max_risk > 0.9 else 'high',
+            'max_risk_value': max_risk,
+            'risk_level': risk_level,
             'affected_population_estimate': _estimate_affected_population(lat, lon, area_km2),
             'priority': i  # Based on size/risk
-        })
+        }
+        for i, lat, lon, area_km2, max_risk, risk_level in zip(
+            region_ids.tolist(), lats.tolist(), lons.tolist(),
+            areas_km2.tolist(), max_risks.tolist(), risk_levels.tolist()
+        )
+    ]
 
     # Sort by risk and size
     high_risk_areas.sort(key=lambda x: x['max_risk_value'] * x['area_km2'], reverse=True)
@@ -730,6 +749,19 @@ def _estimate_affected_population(lat: float, lon: float, area_km2: float) -> in
 
     return int(area_km2 * avg_density)
 
+
+def _json_ready(value: Any) -> Any:
+    """Convert NumPy arrays and scalars in model output to JSON-native values"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {key: _json_ready(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_ready(item) for item in value]
+    return value
+
 @router.get("/predict/status/{prediction_id}")
 async def get_prediction_status(
         prediction_id: str,
@@ -770,7 +802,7 @@ async def run_paradise_demo(
         return {
             "demonstration": "Paradise Fire - November 8, 2018",
             "historical_data": demo_data,
-            "quantum_prediction": result,
+            "quantum_prediction": _json_ready(result),
             "key_findings": {
                 "ember_jump_detected": "7:35 AM",
                 "actual_paradise_ignition": "8:00 AM",
@@ -18,6 +18,9 @@ logger = logging.getLogger(__name__)
 class OpenMeteoWeatherCollector:
     """Industrial-grade weather data collector using Open-Meteo API"""
 
+    # Number of station-to-grid interpolation weight sets kept
+    IDW_CACHE_SIZE = 8
+
     def __init__(self):
         self.base_url = "https://api.open-meteo.com/v1/forecast"
         self.session: Optional[aiohttp.ClientSession] = None
@@ -29,6 +32,7 @@ class OpenMeteoWeatherCollector:
             'last_collection_time': None,
             'average_response_time': 0
         }
+        self._idw_cache: Dict[Tuple, np.ndarray] = {}
 
     async def initialize(self):
         """Initialize the collector with connection pooling"""
@@ -327,38 +331,19 @@ class OpenMeteoWeatherCollector:
         if not stations:
             return wind_field
 
-        # Create interpolation grid
-        lat_range = np.linspace(bounds['south'], bounds['north'], grid_size)
-        lon_range = np.linspace(bounds['west'], bounds['east'], grid_size)
+        speeds = np.array([station.get('wind_speed') for station in stations], dtype=float)
+        directions = np.array([station.get('wind_direction') for station in stations], dtype=float)
+        valid = ~(np.isnan(speeds) | np.isnan(directions))
+        if not valid.any():
+            return wind_field
+
+        # Convert wind to u,v components
+        wind_rad = np.radians(directions[valid])
+        uv = np.stack([speeds[valid] * np.sin(wind_rad), speeds[valid] * np.cos(wind_rad)], axis=1)
 
         # Simple inverse distance weighting interpolation
-        for i, lat in enumerate(lat_range):
-            for j, lon in enumerate(lon_range):
-                # Calculate weighted average from all stations
-                total_weight = 0
-                u_component = 0
-                v_component = 0
-
-                for station in stations:
-                    if station.get('wind_speed') is not None and station.get('wind_direction') is not None:
-                        # Calculate distance
-                        dist = np.sqrt((lat - station['latitude']) ** 2 + (lon - station['longitude']) ** 2)
-
-                        # Inverse distance weight (avoid division by zero)
-                        weight = 1 / (dist + 0.01)
-
-                        # Convert wind to u,v components
-                        wind_rad = np.radians(station['wind_direction'])
-                        u = station['wind_speed'] * np.sin(wind_rad)
-                        v = station['wind_speed'] * np.cos(wind_rad)
-
-                        u_component += u * weight
-                        v_component += v * weight
-                        total_weight += weight
-
-                if total_weight > 0:
-                    wind_field[i, j, 0] = u_component / total_weight
-                    wind_field[i, j, 1] = v_component / total_weight
+        weights = self._idw_weights(stations, bounds, grid_size)[..., valid]
+        wind_field = (weights @ uv) / weights.sum(axis=-1, keepdims=True)
 
         return wind_field
 
@@ -376,25 +361,45 @@ class OpenMeteoWeatherCollector:
         if not stations:
             return field
 
-        lat_range = np.linspace(bounds['south'], bounds['north'], grid_size)
-        lon_range = np.linspace(bounds['west'], bounds['east'], grid_size)
+        values = np.array([station.get(variable) for station in stations], dtype=float)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return field
+
+        weights = self._idw_weights(stations, bounds, grid_size)[..., valid]
+        field = (weights @ values[valid]) / weights.sum(axis=-1)
+
+        return field
+
+    def _idw_weights(
+            self,
+            stations: List[Dict[str, Any]],
+            bounds: Dict[str, float],
+            grid_size: int
+    ) -> np.ndarray:
+        """Inverse distance weights from each station to each grid cell, shape (grid, grid, stations)"""
+        station_lats = np.array([station['latitude'] for station in stations], dtype=float)
+        station_lons = np.array([station['longitude'] for station in stations], dtype=float)
+        key = (
+            station_lats.tobytes(), station_lons.tobytes(),
+            bounds['south'], bounds['north'], bounds['west'], bounds['east'], grid_size
+        )
 
-        for i, lat in enumerate(lat_range):
-            for j, lon in enumerate(lon_range):
-                total_weight = 0
-                weighted_sum = 0
+        weights = self._idw_cache.get(key)
+        if weights is None:
+            lat_range = np.linspace(bounds['south'], bounds['north'], grid_size)
+            lon_range = np.linspace(bounds['west'], bounds['east'], grid_size)
 
-                for station in stations:
-                    if station.get(variable) is not None:
-                        dist = np.sqrt((lat - station['latitude']) ** 2 + (lon - station['longitude']) ** 2)
-                        weight = 1 / (dist + 0.01)
-                        weighted_sum += station[variable] * weight
-                        total_weight += weight
+            dist = np.sqrt((lat_range[:, None, None] - station_lats) ** 2 +
+                           (lon_range[None, :, None] - station_lons) ** 2)
 
-                if total_weight > 0:
-                    field[i, j] = weighted_sum / total_weight
+            # Inverse distance weight (avoid division by zero)
+            weights = 1 / (dist + 0.01)
 
-        return field
+            if len(self._idw_cache) >= self.IDW_CACHE_SIZE:
+                self._idw_cache.pop(next(iter(self._idw_cache)))
+            self._idw_cache[key] = weights
+        return weights
 
     def _aggregate_fire_weather(self, point_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Aggregate fire weather indices across the area"""
@@ -5,24 +5,72 @@ Implements a true quantum algorithm with superposition and entanglement
 """
 
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Union
 import logging
+import math
 from dataclasses import dataclass
 from datetime import datetime
 import asyncio
 
+from scipy.ndimage import label, center_of_mass, convolve, sum_labels, maximum as ndi_maximum
+
 from classiq import (
     qfunc, QArray, QBit, QNum, Output,
     H, X, CX, RY, RZ, control, repeat,
-    within_apply, grover_operator,
+    within_apply, grover_operator, if_,
+    CArray, CInt,
     create_model, synthesize, execute,
     set_constraints, set_preferences,
     Constraints, Preferences, QuantumProgram
 )
 from classiq.execution import ExecutionPreferences
 
+from ..hardware_interface import wait_for_job_result
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# 4-connected neighbor count kernel used for perimeter detection
+VON_NEUMANN_KERNEL = np.array([[0, 1, 0],
+                               [1, 0, 1],
+                               [0, 1, 0]], dtype=np.uint8)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True)
+    def _perimeter_kernel(burning: np.ndarray, cell_size: float) -> float:
+        """Perimeter in km of a boolean burning mask (4-neighbor rule)"""
+        rows, cols = burning.shape
+        perimeter_cells = 0
+        for i in range(rows):
+            for j in range(cols):
+                if burning[i, j] and (
+                        i == 0 or j == 0 or i == rows - 1 or j == cols - 1 or
+                        not burning[i - 1, j] or not burning[i + 1, j] or
+                        not burning[i, j - 1] or not burning[i, j + 1]
+                ):
+                    perimeter_cells += 1
+        return perimeter_cells * cell_size / 1000
+
+    @njit(cache=True, nogil=True)
+    def _spread_distance_kernel(burning: np.ndarray, cell_size: float) -> float:
+        """Total spread distance in m over a stacked (T, H, W) burning mask"""
+        steps, rows, cols = burning.shape
+        total_spread = 0.0
+        for t in range(1, steps):
+            new_fires = 0
+            for i in range(rows):
+                for j in range(cols):
+                    if burning[t, i, j] and not burning[t - 1, i, j]:
+                        new_fires += 1
+            total_spread += np.sqrt(new_fires) * cell_size
+        return total_spread
+
 
 @dataclass
 class CellState:
@@ -79,7 +127,12 @@ class WindConditions:
         Uses true quantum superposition to explore all possible fire spread paths simultaneously.
         """
 
-        def __init__(self, grid_size: int = 50, cell_size_meters: float = 100):
+        def __init__(
+                self,
+                grid_size: int = 50,
+                cell_size_meters: float = 100,
+                optimization_level: Optional[int] = None
+        ):
             self.grid_size = grid_size
             self.cell_size = cell_size_meters
             self.num_cells = grid_size * grid_size
@@ -89,11 +142,25 @@ class WindConditions:
             self.state_qubits = 4  # fuel, moisture, temp, burning
             self.total_qubits = self.position_qubits + self.state_qubits
 
+            # Synthesis effort; None picks 3 for small grids and 1 above 25x25,
+            # where level-3 layout/routing dominates compile time
+            self.optimization_level = optimization_level
+            self.max_synthesis_depth = 50_000
+
             # CA parameters based on research
             self.spread_probability_base = 0.58  # Base probability from literature
             self.extinction_threshold = 0.1  # Below this, fire dies
             self.crown_fire_threshold = 0.8  # Above this, crown fire
 
+            # Grid -> geographic affine (simplified, centered on Paradise, CA)
+            self._lat0 = 39.7596
+            self._lon0 = -121.6219
+            self._scale = 0.001
+            self._grid_center = grid_size / 2
+
+            # Flat Moore neighbor table (8 entries per cell, -1 = off-grid)
+            self._moore = self._build_moore_table().ravel().tolist()
+
             # Performance tracking
             self.synthesis_metrics = {}
             self.execution_metrics = {}
@@ -126,7 +193,8 @@ class WindConditions:
                     grid: QArray[QBit],
                     wind: QArray[QBit],
                     fuel: QArray[QBit],
-                    moisture: QArray[QBit]
+                    moisture: QArray[QBit],
+                    neighbor_table: CArray[CInt]
             ):
                 """Apply quantum fire spread rules"""
 
@@ -134,7 +202,7 @@ class WindConditions:
                 repeat(
                     grid.len,
                     lambda i: apply_cell_transition(
-                        grid, wind, fuel, moisture, i
+                        grid, wind, fuel, moisture, neighbor_table, i
                     )
                 )
 
@@ -144,19 +212,20 @@ class WindConditions:
                     wind: QArray[QBit],
                     fuel: QArray[QBit],
                     moisture: QArray[QBit],
-                    cell_idx: int
+                    neighbor_table: CArray[CInt],
+                    cell_idx: CInt
             ):
                 """Quantum transition rule for a single cell"""
 
-                # Get neighbors (Moore neighborhood)
-                neighbors = get_moore_neighbors(cell_idx, self.grid_size)
-
-                # Check if any neighbor is burning
-                for n_idx in neighbors:
-                    if n_idx >= 0:  # Valid neighbor
+                # Check if any Moore neighbor is burning; the loop is left to
+                # the Classiq compiler instead of being unrolled in Python
+                repeat(
+                    8,
+                    lambda k: if_(
+                        neighbor_table[cell_idx * 8 + k] >= 0,  # Valid neighbor
                         # Controlled rotation based on neighbor state
-                        control(
-                            grid[n_idx],
+                        lambda: control(
+                            grid[neighbor_table[cell_idx * 8 + k]],
                             lambda: apply_spread_probability(
                                 grid[cell_idx],
                                 wind[cell_idx],
@@ -164,6 +233,8 @@ class WindConditions:
                                 moisture[cell_idx]
                             )
                         )
+                    )
+                )
 
             @qfunc
             def apply_spread_probability(
@@ -219,7 +290,7 @@ class WindConditions:
                 repeat(
                     time_steps,
                     lambda t: apply_spread_rules(
-                        grid, wind_data, fuel_data, moisture_data
+                        grid, wind_data, fuel_data, moisture_data, self._moore
                     )
                 )
 
@@ -235,12 +306,17 @@ class WindConditions:
             # Set constraints for synthesis
             constraints = Constraints(
                 max_width=self.total_qubits,
-                max_depth=1000 * time_steps
+                max_depth=min(1000 * time_steps, self.max_synthesis_depth)
             )
 
+            if self.optimization_level is not None:
+                opt_level = self.optimization_level
+            else:
+                opt_level = 1 if self.num_cells > 625 else 3
+
             preferences = Preferences(
                 random_seed=42,
-                optimization_level=3
+                optimization_level=opt_level
             )
 
             # Create model
@@ -313,25 +389,21 @@ class WindConditions:
 
             # Execute
             job = execute(quantum_program, execution_prefs)
-            results = job.result()
+            results = await wait_for_job_result(job)
 
-            # Process quantum results
-            fire_evolution = self._process_quantum_results(
+            # Post-processing is CPU-bound; run it off the event loop
+            simulation_result = await asyncio.to_thread(
+                self._finalize_results,
                 results,
                 initial_conditions,
                 time_steps
             )
 
-            # Calculate key metrics
             execution_time = (datetime.now() - start_time).total_seconds()
 
             return {
-                'fire_evolution': fire_evolution,
+                **simulation_result,
                 'time_steps': time_steps,
-                'final_burned_area': self._calculate_burned_area(fire_evolution[-1]),
-                'fire_perimeter': self._calculate_perimeter(fire_evolution[-1]),
-                'spread_rate': self._calculate_spread_rate(fire_evolution),
-                'high_intensity_areas': self._identify_high_intensity_areas(fire_evolution[-1]),
                 'metadata': {
                     'model': 'quantum_cellular_automaton',
                     'grid_size': self.grid_size,
@@ -342,12 +414,51 @@ class WindConditions:
                     **self.synthesis_metrics
                 },
                 'quantum_advantage': {
-                    'states_explored': 2 ** self.num_cells,  # All possible fire configurations
-                    'classical_equivalent_time': execution_time * (2 ** (self.num_cells / 2)),
-                    'speedup_factor': 2 ** (self.num_cells / 2)
+                    'states_explored': f'2^{self.num_cells}',  # All possible fire configurations
+                    'states_explored_log10': self.num_cells * math.log10(2),
+                    'speedup_factor': f'2^{self.num_cells / 2:g}',
+                    'speedup_factor_log10': self.num_cells / 2 * math.log10(2)
                 }
             }
 
+        def _finalize_results(
+                self,
+                results: Any,
+                initial_conditions: Dict[str, np.ndarray],
+                time_steps: int
+        ) -> Dict[str, Any]:
+            """Process quantum results into the fire evolution and its key metrics"""
+            fire_evolution = self._process_quantum_results(
+                results,
+                initial_conditions,
+                time_steps
+            )
+
+            # Share the final-state masks across the metric helpers
+            final_state = fire_evolution[-1]
+            burning_mask = final_state > 0
+            high_mask = final_state > 0.8
+
+            return {
+                'fire_evolution': fire_evolution,
+                'final_burned_area': self._calculate_burned_area(final_state, burning_mask=burning_mask),
+                'fire_perimeter': self._calculate_perimeter(final_state, burning_mask=burning_mask),
+                'spread_rate': self._calculate_spread_rate(fire_evolution),
+                'high_intensity_areas': self._identify_high_intensity_areas(final_state, high_mask=high_mask)
+            }
+
+        def _build_moore_table(self) -> np.ndarray:
+            """Moore neighbor indices for every cell, shape (num_cells, 8), -1 for off-grid"""
+            rows, cols = np.divmod(np.arange(self.num_cells, dtype=np.int32), self.grid_size)
+            offsets = np.array([(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                                if (di, dj) != (0, 0)], dtype=np.int32)
+
+            ni = rows[:, None] + offsets[:, 0]
+            nj = cols[:, None] + offsets[:, 1]
+            valid = (ni >= 0) & (ni < self.grid_size) & (nj >= 0) & (nj < self.grid_size)
+
+            return np.where(valid, ni * self.grid_size + nj, -1).astype(np.int32)
+
         def _get_fire_positions(self, fire_state: np.ndarray) -> List[int]:
             """Extract initial fire cell positions"""
             positions = []
@@ -365,24 +476,27 @@ class WindConditions:
             """Prepare classical data for quantum circuit"""
 
             # Flatten and normalize data
-            fuel_flat = initial_conditions['fuel_load'].flatten()
-            moisture_flat = initial_conditions['moisture'].flatten()
-            temp_flat = initial_conditions['temperature'].flatten()
+            fuel_flat = initial_conditions['fuel_load'].ravel()
+            moisture_flat = initial_conditions['moisture'].ravel()
+            temp_flat = initial_conditions['temperature'].ravel()
 
             # Normalize to [0, 1]
-            fuel_norm = fuel_flat / np.max(fuel_flat) if np.max(fuel_flat) > 0 else fuel_flat
+            fuel_max = float(fuel_flat.max(initial=0.0))
+            fuel_norm = np.divide(fuel_flat, fuel_max, out=fuel_flat.astype(float), where=fuel_max > 0)
             moisture_norm = moisture_flat / 100  # Assuming percentage
             temp_norm = (temp_flat - 273.15) / 50  # Kelvin to normalized
 
-            # Wind encoding
-            wind_magnitude = np.linalg.norm(wind_conditions.speed_matrix)
-            wind_norm = wind_conditions.speed_matrix / wind_magnitude if wind_magnitude > 0 else wind_conditions.speed_matrix
+            # Wind encoding, scaled by the peak speed into [0, 1]
+            wind_speed = wind_conditions.speed_matrix
+            wind_max = float(wind_speed.max(initial=0.0))
+            wind_norm = np.divide(wind_speed, wind_max, out=wind_speed.astype(float), where=wind_max > 0)
 
+            # Classiq accepts array-likes, so hand over the buffers without boxing each value
             return {
-                'fuel': fuel_norm.tolist(),
-                'moisture': moisture_norm.tolist(),
-                'temperature': temp_norm.tolist(),
-                'wind': wind_norm.flatten().tolist()
+                'fuel': fuel_norm,
+                'moisture': moisture_norm,
+                'temperature': temp_norm,
+                'wind': wind_norm.ravel()
             }
 
         def _process_quantum_results(
@@ -395,60 +509,70 @@ class WindConditions:
 
             # Get measurement counts
             counts = results.get_counts() if hasattr(results, 'get_counts') else {}
-            total_shots = sum(counts.values()) if counts else 1
 
             # Initialize evolution tracking
-            fire_evolution = [initial_conditions['fire_state'].copy()]
-
-            # Process each time step (simplified - in reality would track intermediate measurements)
-            for t in range(1, time_steps + 1):
-                # Create probability map from quantum measurements
-                prob_map = np.zeros((self.grid_size, self.grid_size))
+            fire_evolution = [np.array(initial_conditions['fire_state'], dtype=np.float32, order='C')]
+
+            # Measurements are only taken at the end of the circuit, so every
+            # time step shares the same probability map (simplified - in reality
+            # would track intermediate measurements)
+            # float32 is ample for a > 0.5 threshold and halves memory traffic
+            prob_map = np.zeros(self.num_cells, dtype=np.float32)
+
+            if counts:
+                # Ingest bitstrings and counts once: fixed-width bytes -> (K, num_cells) bit matrix
+                items = list(counts.items())
+                keys = np.array(
+                    [bitstring[:self.num_cells].encode() for bitstring, _ in items],
+                    dtype=f'S{self.num_cells}'
+                )
+                values = np.fromiter((count for _, count in items), dtype=np.float32, count=len(items))
+                bits = keys.view(np.uint8).reshape(len(items), self.num_cells) == ord('1')
 
-                for bitstring, count in counts.items():
-                    # Convert bitstring to grid
-                    for idx, bit in enumerate(bitstring[:self.num_cells]):
-                        if bit == '1':
-                            i = idx // self.grid_size
-                            j = idx % self.grid_size
-                            if i < self.grid_size and j < self.grid_size:
-                                # Accumulate probability
-                                prob_map[i, j] += count / total_shots
+                # Accumulate shot-weighted probability for every cell
+                prob_map = (values / values.sum()) @ bits
 
-                # Apply threshold to determine burning cells
-                fire_state = (prob_map > 0.5).astype(float)
+            prob_map = prob_map.reshape(self.grid_size, self.grid_size)
 
-                # Add intensity information
-                fire_state = fire_state * prob_map
+            # Apply threshold to determine burning cells, keeping intensity information
+            fire_state = np.where(prob_map > 0.5, prob_map, np.float32(0))
 
-                fire_evolution.append(fire_state)
+            # Steps reference one shared map; freeze it so callers can't alias-mutate
+            fire_state.setflags(write=False)
+            fire_evolution.extend([fire_state] * time_steps)
 
             return fire_evolution
 
-        def _calculate_burned_area(self, fire_state: np.ndarray) -> float:
+        def _calculate_burned_area(
+                self,
+                fire_state: np.ndarray,
+                burning_mask: Optional[np.ndarray] = None
+        ) -> float:
             """Calculate total burned area in hectares"""
-            burned_cells = np.sum(fire_state > 0)
+            if burning_mask is None:
+                burning_mask = fire_state > 0
+            burned_cells = np.sum(burning_mask)
             cell_area_hectares = (self.cell_size ** 2) / 10000
             return burned_cells * cell_area_hectares
 
-        def _calculate_perimeter(self, fire_state: np.ndarray) -> float:
+        def _calculate_perimeter(
+                self,
+                fire_state: np.ndarray,
+                burning_mask: Optional[np.ndarray] = None
+        ) -> float:
             """Calculate fire perimeter in kilometers"""
-            perimeter_cells = 0
+            if burning_mask is None:
+                burning_mask = fire_state > 0
 
-            for i in range(self.grid_size):
-                for j in range(self.grid_size):
-                    if fire_state[i, j] > 0:
-                        # Check if any neighbor is not burning
-                        for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                            ni, nj = i + di, j + dj
-                            if 0 <= ni < self.grid_size and 0 <= nj < self.grid_size:
-                                if fire_state[ni, nj] == 0:
-                                    perimeter_cells += 1
-                                    break
-                            else:
-                                # Edge cell
-                                perimeter_cells += 1
-                                break
+            if NUMBA_AVAILABLE:
+                return _perimeter_kernel(np.ascontiguousarray(burning_mask), float(self.cell_size))
+
+            burning = burning_mask.astype(np.uint8)
+
+            # A burning cell is on the perimeter unless all 4 neighbors burn;
+            # cval=0 treats out-of-grid neighbors as unburnt (edge cells)
+            neighbors = convolve(burning, VON_NEUMANN_KERNEL, mode='constant', cval=0)
+            perimeter_cells = np.count_nonzero(burning & (neighbors < 4))
 
             return perimeter_cells * self.cell_size / 1000  # Convert to km
 
@@ -457,62 +581,70 @@ class WindConditions:
             if len(fire_evolution) < 2:
                 return 0
 
-            total_spread = 0
             time_steps = len(fire_evolution) - 1
 
-            for t in range(1, len(fire_evolution)):
-                # Count new fire cells
-                new_fires = np.sum((fire_evolution[t] > 0) & (fire_evolution[t - 1] == 0))
+            # Stack the boolean masks once (1 byte/cell) and diff along the time axis
+            burning = np.stack([state > 0 for state in fire_evolution])  # (T, H, W)
+
+            if NUMBA_AVAILABLE:
+                total_spread = _spread_distance_kernel(burning, float(self.cell_size))
+            else:
+                # Count new fire cells per step
+                new_fires = np.count_nonzero(burning[1:] & ~burning[:-1], axis=(1, 2))
 
                 # Approximate spread distance
-                spread_distance = np.sqrt(new_fires) * self.cell_size
-                total_spread += spread_distance
+                total_spread = (np.sqrt(new_fires) * self.cell_size).sum()
 
             # Average spread rate
             total_minutes = time_steps * 15  # Assuming 15-minute steps
-            return total_spread / total_minutes if total_minutes > 0 else 0
+            return total_spread / total_minutes
 
-        def _identify_high_intensity_areas(self, fire_state: np.ndarray) -> List[Dict[str, Any]]:
+        def _identify_high_intensity_areas(
+                self,
+                fire_state: np.ndarray,
+                high_mask: Optional[np.ndarray] = None
+        ) -> List[Dict[str, Any]]:
             """Identify areas of high fire intensity"""
             high_intensity_threshold = 0.8
             high_intensity_areas = []
 
             # Find connected components of high intensity
-            high_intensity_mask = fire_state > high_intensity_threshold
+            high_intensity_mask = high_mask if high_mask is not None else fire_state > high_intensity_threshold
 
-            from scipy.ndimage import label
             labeled, num_features = label(high_intensity_mask)
 
-            for i in range(1, num_features + 1):
-                component = (labeled == i)
+            # Per-component statistics in one pass over the label map
+            component_ids = np.arange(1, num_features + 1)
+            centers = center_of_mass(high_intensity_mask, labeled, component_ids)
+            sizes = sum_labels(high_intensity_mask, labeled, component_ids)
+            max_intensities = ndi_maximum(fire_state, labeled, component_ids)
 
-                # Calculate center of mass
-                indices = np.where(component)
-                center_i = np.mean(indices[0])
-                center_j = np.mean(indices[1])
-
-                # Convert to geographic coordinates (simplified)
-                lat = self._grid_to_lat(center_i)
-                lon = self._grid_to_lon(center_j)
+            # Convert all centers to geographic coordinates at once (simplified)
+            centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+            lats = self._grid_to_lat(centers[:, 0])
+            lons = self._grid_to_lon(centers[:, 1])
 
+            for component_id, lat, lon, size, max_intensity in zip(
+                    component_ids, lats, lons, sizes, max_intensities
+            ):
                 high_intensity_areas.append({
-                    'id': i,
-                    'center': {'latitude': lat, 'longitude': lon},
-                    'size_hectares': np.sum(component) * (self.cell_size ** 2) / 10000,
-                    'max_intensity': np.max(fire_state[component]),
+                    'id': int(component_id),
+                    'center': {'latitude': float(lat), 'longitude': float(lon)},
+                    'size_hectares': size * (self.cell_size ** 2) / 10000,
+                    'max_intensity': max_intensity,
                     'threat_level': 'extreme'
                 })
 
             return high_intensity_areas
 
-        def _grid_to_lat(self, i: float) -> float:
-            """Convert grid coordinate to latitude (simplified)"""
+        def _grid_to_lat(self, i: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+            """Convert grid row coordinate(s) to latitude (simplified)"""
             # This would use actual geographic transformation
-            return 39.7596 + (i - self.grid_size / 2) * 0.001
+            return self._lat0 + (i - self._grid_center) * self._scale
 
-        def _grid_to_lon(self, j: float) -> float:
-            """Convert grid coordinate to longitude (simplified)"""
-            return -121.6219 + (j - self.grid_size / 2) * 0.001
+        def _grid_to_lon(self, j: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+            """Convert grid column coordinate(s) to longitude (simplified)"""
+            return self._lon0 + (j - self._grid_center) * self._scale
 
         async def validate_against_historical(
                 self,
@@ -552,22 +684,3 @@ class WindConditions:
                 ),
                 'overall_accuracy': (1 - area_error) * 0.5 + iou * 0.5
             }
-
-    def get_moore_neighbors(cell_idx: int, grid_size: int) -> List[int]:
-        """Get Moore neighborhood (8-connected) for a cell"""
-        i = cell_idx // grid_size
-        j = cell_idx % grid_size
-
-        neighbors = []
-        for di in [-1, 0, 1]:
-            for dj in [-1, 0, 1]:
-                if di == 0 and dj == 0:
-                    continue
-
-                ni, nj = i + di, j + dj
-                if 0 <= ni < grid_size and 0 <= nj < grid_size:
-                    neighbors.append(ni * grid_size + nj)
-                else:
-                    neighbors.append(-1)  # Invalid neighbor
-
-        return neighbors
\ No newline at end of file
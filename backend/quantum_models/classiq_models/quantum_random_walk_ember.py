@@ -4,11 +4,15 @@ Quantum Random Walk for Ember Transport Simulation
 Uses quantum superposition to track all possible ember trajectories
 """
 
+import copy
+import hashlib
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
 import logging
+import math
 from dataclasses import dataclass
 from datetime import datetime
+from scipy import ndimage as ndi
 
 from classiq import (
     qfunc, QArray, QBit, QNum, Output,
@@ -18,8 +22,69 @@ from classiq import (
     create_model, synthesize, execute, allocate
 )
 
+try:
+    from numba import njit, vectorize
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# 4-connected neighborhood used to label ignition zones
+ZONE_CONNECTIVITY = np.array([[0, 1, 0],
+                              [1, 1, 1],
+                              [0, 1, 0]], dtype=bool)
+
+
+if NUMBA_AVAILABLE:
+    @vectorize(['float64(float64, float64, float64)'], nopython=True, fastmath=True, cache=True)
+    def _ember_survival(temperature, mass, flight_time):
+        """Ember burning probability after flight_time seconds (broadcasting ufunc)"""
+        final_temp = temperature - 50.0 * flight_time / 60.0
+        if final_temp < 300.0:
+            return 0.0
+        return math.exp(-(0.01 / mass) * flight_time)
+
+    @njit(cache=True, nogil=True)
+    def _landing_kernel(distance_km, ux, uy, wind_x, wind_y, decay, weights, out):
+        """Weighted sum of per-type normalized landing maps in one fused kernel.
+
+        Each type's map is exp(-d/5) * wind_boost * exp(-decay[k] * d); like
+        _execute_quantum_walk it is normalized to unit sum only when that sum is
+        positive, then scaled by weights[k] and accumulated into out.
+        """
+        rows, cols = distance_km.shape
+        n_types = decay.shape[0]
+
+        # Pass 1: per-type totals
+        totals = np.zeros(n_types)
+        for i in range(rows):
+            for j in range(cols):
+                d = distance_km[i, j]
+                shared = math.exp(-d / 5.0) * (1.0 + 0.5 * (ux[i, j] * wind_x + uy[i, j] * wind_y))
+                for k in range(n_types):
+                    totals[k] += shared * math.exp(-decay[k] * d)
+
+        scale = weights.copy()
+        for k in range(n_types):
+            if totals[k] > 0.0:
+                scale[k] /= totals[k]
+
+        # Pass 2: accumulate every type into the output in a single grid sweep
+        for i in range(rows):
+            for j in range(cols):
+                d = distance_km[i, j]
+                shared = math.exp(-d / 5.0) * (1.0 + 0.5 * (ux[i, j] * wind_x + uy[i, j] * wind_y))
+                acc = 0.0
+                for k in range(n_types):
+                    acc += scale[k] * math.exp(-decay[k] * d)
+                out[i, j] = shared * acc
+else:
+    def _ember_survival(temperature, mass, flight_time):
+        """Ember burning probability after flight_time seconds (broadcasting ufunc)"""
+        final_temp = temperature - 50.0 * np.asarray(flight_time, dtype=float) / 60.0
+        return np.where(final_temp < 300.0, 0.0, np.exp(-(0.01 / mass) * flight_time))
+
 
 @dataclass
 class EmberParticle:
@@ -32,17 +97,54 @@ class EmberParticle:
 
     def survival_probability(self, flight_time: float) -> float:
         """Calculate probability ember stays burning during flight"""
-        # Based on experimental data
-        cooling_rate = 50  # °C/min
-        final_temp = self.temperature - (cooling_rate * flight_time / 60)
+        # Cools at 50°C/min and dies below 300°C; lighter embers burn out faster
+        return float(_ember_survival(self.temperature, self.mass, flight_time))
 
-        # Ember dies below 300°C
-        if final_temp < 300:
-            return 0
 
-        # Exponential decay model
-        decay_constant = 0.01 * (1 / self.mass)  # Lighter embers burn out faster
-        return np.exp(-decay_constant * flight_time)
+@dataclass
+class EmberBatch:
+    """Ember particle states stored as parallel arrays"""
+    position: np.ndarray  # (N, 3) positions
+    velocity: np.ndarray  # (N, 3) velocities
+    mass: np.ndarray  # (N,) grams
+    temperature: np.ndarray  # (N,) Celsius
+    burning_time: np.ndarray  # (N,) seconds
+
+    def __len__(self) -> int:
+        return len(self.mass)
+
+    def survival_probability(self, flight_time: Any) -> np.ndarray:
+        """Per-particle probability of staying lit for flight_time (broadcasts)"""
+        return _ember_survival(self.temperature, self.mass, flight_time)
+
+    def particles(self) -> List[EmberParticle]:
+        """Materialize per-particle EmberParticle objects"""
+        return [
+            EmberParticle(
+                position=self.position[k],
+                velocity=self.velocity[k],
+                mass=float(self.mass[k]),
+                temperature=float(self.temperature[k]),
+                burning_time=float(self.burning_time[k])
+            )
+            for k in range(len(self))
+        ]
+
+
+def _cache_key(value: Any) -> Any:
+    """Hashable, content-based key for simulation inputs"""
+    if isinstance(value, np.ndarray):
+        digest = hashlib.blake2b(np.ascontiguousarray(value), digest_size=16).digest()
+        return value.shape, value.dtype.str, digest
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _cache_key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_cache_key(v) for v in value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
 
 
 class QuantumRandomWalkEmber:
@@ -51,6 +153,9 @@ class QuantumRandomWalkEmber:
     Tracks superposition of all possible trajectories
     """
 
+    # Number of recent simulate_ember_transport results kept per instance
+    SIMULATION_CACHE_SIZE = 16
+
     def __init__(
             self,
             grid_size: int = 100,
@@ -71,6 +176,27 @@ class QuantumRandomWalkEmber:
         self.air_density = 1.225  # kg/m³
         self.drag_coefficient = 0.47  # Sphere
 
+        # Cell offsets/distances from the fire source at the grid center
+        ii, jj = np.meshgrid(np.arange(grid_size), np.arange(grid_size), indexing='ij')
+        grid_dx = ii - grid_size / 2
+        grid_dy = jj - grid_size / 2
+        grid_distance = np.hypot(grid_dx, grid_dy)
+        self._distance_km_grid = (grid_distance * self.max_distance / self.grid_size).astype(np.float32)
+
+        # Unit direction away from the source (zero at the source itself)
+        inv_distance = np.divide(1.0, grid_distance, out=np.zeros_like(grid_distance),
+                                 where=grid_dx * grid_dx + grid_dy * grid_dy > 0)
+        self._grid_ux = (grid_dx * inv_distance).astype(np.float32)
+        self._grid_uy = (grid_dy * inv_distance).astype(np.float32)
+
+        self._rng = np.random.default_rng()
+
+        # Synthesized programs keyed by (position_qubits, coin_qubits, num_steps)
+        self._program_cache: Dict[Tuple[int, int, int], Any] = {}
+
+        # Recent simulation results keyed by their (content-hashed) inputs
+        self._simulation_cache: Dict[Tuple, Dict[str, Any]] = {}
+
         logger.info(f"Initialized Quantum Random Walk: {grid_size}x{grid_size}x{height_levels} grid")
 
     async def simulate_ember_transport(
@@ -83,9 +209,36 @@ class QuantumRandomWalkEmber:
         """
         Simulate ember transport using quantum random walk
 
+        Results are memoized on the input contents (last SIMULATION_CACHE_SIZE
+        inputs), so repeated scenarios (e.g. during historical validation) reuse
+        the earlier simulation, including its random ember sample, instead of
+        drawing a new one. Each call returns a deep copy of the cached result.
+
         Returns:
             Ember landing probabilities and ignition risks
         """
+        key = _cache_key((fire_source, wind_field_3d, atmospheric_conditions, duration_minutes))
+        cached = self._simulation_cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        result = await self._simulate_ember_transport(
+            fire_source, wind_field_3d, atmospheric_conditions, duration_minutes
+        )
+
+        if len(self._simulation_cache) >= self.SIMULATION_CACHE_SIZE:
+            self._simulation_cache.pop(next(iter(self._simulation_cache)))
+        self._simulation_cache[key] = result
+        return copy.deepcopy(result)
+
+    async def _simulate_ember_transport(
+            self,
+            fire_source: Dict[str, Any],
+            wind_field_3d: np.ndarray,
+            atmospheric_conditions: Dict[str, Any],
+            duration_minutes: int
+    ) -> Dict[str, Any]:
+        """Uncached ember transport simulation"""
         start_time = datetime.now()
 
         # Generate initial ember distribution
@@ -160,30 +313,36 @@ class QuantumRandomWalkEmber:
             RY(theta_y, coin[1])
             RY(theta_z, coin[2])
 
-        # Create and synthesize model
-        logger.info("Building quantum random walk circuit...")
-
         # Calculate time steps
         time_step_seconds = 10
         num_steps = int(duration_minutes * 60 / time_step_seconds)
 
-        model = create_model(quantum_random_walk)
-        quantum_program = synthesize(model)
-
-        # Execute for each ember type
-        landing_probabilities = np.zeros((self.grid_size, self.grid_size))
-
-        for ember_type in self._classify_embers(embers):
-            # Run quantum simulation
-            result = await self._execute_quantum_walk(
-                quantum_program,
-                ember_type,
-                wind_field_3d,
-                num_steps
-            )
-
-            # Accumulate results
-            landing_probabilities += result['landing_map'] * ember_type['weight']
+        # Create and synthesize model (circuit depends only on register sizes and step count)
+        program_key = (self.position_qubits, self.coin_qubits, num_steps)
+        quantum_program = self._program_cache.get(program_key)
+        if quantum_program is None:
+            logger.info(f"Building quantum random walk circuit for {num_steps} steps...")
+            model = create_model(quantum_random_walk)
+            quantum_program = synthesize(model)
+            self._program_cache[program_key] = quantum_program
+
+        ember_types = self._classify_embers(embers)
+
+        if NUMBA_AVAILABLE and ember_types:
+            # All ember types in one fused grid pass
+            landing_probabilities = self._fused_landing_map(ember_types, wind_field_3d)
+        elif ember_types:
+            # Execute for each ember type, accumulating the weighted maps in place
+            landing_probabilities = np.zeros((self.grid_size, self.grid_size), dtype=np.float32)
+            weighted = np.empty_like(landing_probabilities)
+            for ember_type in ember_types:
+                result = await self._execute_quantum_walk(
+                    quantum_program, ember_type, wind_field_3d, num_steps
+                )
+                np.multiply(result['landing_map'], np.float32(ember_type['weight']), out=weighted)
+                landing_probabilities += weighted
+        else:
+            landing_probabilities = np.zeros((self.grid_size, self.grid_size), dtype=np.float32)
 
         # Calculate ignition probabilities
         ignition_risks = self._calculate_ignition_risks(
@@ -213,84 +372,94 @@ class QuantumRandomWalkEmber:
                 'total_embers_simulated': len(embers),
                 'execution_time_seconds': execution_time,
                 'quantum_advantage': {
-                    'paths_explored': 6 ** num_steps,  # All possible 3D paths
+                    'paths_explored': f'6^{num_steps}',  # All possible 3D paths
+                    'paths_explored_log10': num_steps * math.log10(6),
                     'classical_complexity': f'O({len(embers)} * {num_steps}²)',
                     'quantum_complexity': f'O(√{len(embers)} * {num_steps})'
                 }
             }
         }
 
-    def _generate_ember_particles(self, fire_source: Dict) -> List[EmberParticle]:
+    def _generate_ember_particles(self, fire_source: Dict) -> EmberBatch:
         """Generate realistic ember particle distribution"""
-        particles = []
+        rng = self._rng
 
         # Fire parameters
         fire_intensity = fire_source.get('intensity', 0.8)
         fire_area = fire_source.get('area_hectares', 100)
 
         # Number of embers (empirical formula)
-        num_embers = int(fire_intensity * fire_area * 100)
-
-        for _ in range(min(num_embers, 10000)):  # Cap at 10k
-            # Mass distribution (log-normal)
-            mass = np.random.lognormal(mean=-2, sigma=0.5)  # 0.01-1g typical
-
-            # Initial velocity (fire plume)
-            plume_velocity = fire_intensity * 30  # m/s
-            velocity = np.array([
-                np.random.normal(0, 5),  # Horizontal spread
-                np.random.normal(0, 5),
-                plume_velocity + np.random.normal(0, 5)  # Upward
-            ])
-
-            # Temperature (depends on fire intensity)
-            temperature = 600 + fire_intensity * 300 + np.random.normal(0, 50)
-
-            # Position (within fire perimeter)
-            angle = np.random.uniform(0, 2 * np.pi)
-            radius = np.random.uniform(0, np.sqrt(fire_area * 10000) / 2)
-            position = np.array([
-                radius * np.cos(angle),
-                radius * np.sin(angle),
-                np.random.uniform(1, 10)  # Initial height
-            ])
-
-            particles.append(EmberParticle(
-                position=position,
-                velocity=velocity,
-                mass=mass,
-                temperature=temperature,
-                burning_time=0
-            ))
-
-        return particles
-
-    def _classify_embers(self, embers: List[EmberParticle]) -> List[Dict]:
+        num_embers = max(min(int(fire_intensity * fire_area * 100), 10000), 0)  # Cap at 10k
+
+        # Mass distribution (log-normal)
+        mass = rng.lognormal(mean=-2, sigma=0.5, size=num_embers)  # 0.01-1g typical
+
+        # Initial velocity (fire plume)
+        plume_velocity = fire_intensity * 30  # m/s
+        velocity = np.column_stack([
+            rng.normal(0, 5, num_embers),  # Horizontal spread
+            rng.normal(0, 5, num_embers),
+            plume_velocity + rng.normal(0, 5, num_embers)  # Upward
+        ])
+
+        # Temperature (depends on fire intensity)
+        temperature = 600 + fire_intensity * 300 + rng.normal(0, 50, num_embers)
+
+        # Position (within fire perimeter)
+        angle = rng.uniform(0, 2 * np.pi, num_embers)
+        radius = rng.uniform(0, np.sqrt(fire_area * 10000) / 2, num_embers)
+        position = np.column_stack([
+            radius * np.cos(angle),
+            radius * np.sin(angle),
+            rng.uniform(1, 10, num_embers)  # Initial height
+        ])
+
+        return EmberBatch(
+            position=position,
+            velocity=velocity,
+            mass=mass,
+            temperature=temperature,
+            burning_time=np.zeros(num_embers)
+        )
+
+    def _classify_embers(self, embers: EmberBatch) -> List[Dict]:
         """Classify embers by mass/temperature for grouped simulation"""
         # Group embers with similar properties
         classifications = []
 
-        # Mass categories
-        mass_bins = [(0, 0.1), (0.1, 0.5), (0.5, 1.0), (1.0, 5.0)]
-        temp_bins = [(500, 600), (600, 700), (700, 800), (800, 1000)]
-
-        for mass_range in mass_bins:
-            for temp_range in temp_bins:
-                group = [e for e in embers
-                         if mass_range[0] <= e.mass < mass_range[1]
-                         and temp_range[0] <= e.temperature < temp_range[1]]
-
-                if group:
-                    avg_mass = np.mean([e.mass for e in group])
-                    avg_temp = np.mean([e.temperature for e in group])
-
-                    classifications.append({
-                        'mass': avg_mass,
-                        'temperature': avg_temp,
-                        'count': len(group),
-                        'weight': len(group) / len(embers),
-                        'terminal_velocity': self._calculate_terminal_velocity(avg_mass)
-                    })
+        # Mass/temperature bin edges: [0, 0.1), [0.1, 0.5), ... and [500, 600), [600, 700), ...
+        mass_edges = [0, 0.1, 0.5, 1.0, 5.0]
+        temp_edges = [500, 600, 700, 800, 1000]
+        num_mass_bins = len(mass_edges) - 1
+        num_temp_bins = len(temp_edges) - 1
+
+        mass = embers.mass
+        temperature = embers.temperature
+
+        # digitize yields 1..n for in-range values, 0 / n + 1 outside
+        mass_idx = np.digitize(mass, mass_edges) - 1
+        temp_idx = np.digitize(temperature, temp_edges) - 1
+        in_range = ((mass_idx >= 0) & (mass_idx < num_mass_bins)
+                    & (temp_idx >= 0) & (temp_idx < num_temp_bins))
+
+        # Mass-major group ids, matching the mass/temperature bin order
+        group_id = mass_idx[in_range] * num_temp_bins + temp_idx[in_range]
+        num_groups = num_mass_bins * num_temp_bins
+        counts = np.bincount(group_id, minlength=num_groups)
+        mass_sum = np.bincount(group_id, weights=mass[in_range], minlength=num_groups)
+        temp_sum = np.bincount(group_id, weights=temperature[in_range], minlength=num_groups)
+
+        for g in np.flatnonzero(counts):
+            avg_mass = mass_sum[g] / counts[g]
+            avg_temp = temp_sum[g] / counts[g]
+
+            classifications.append({
+                'mass': avg_mass,
+                'temperature': avg_temp,
+                'count': int(counts[g]),
+                'weight': counts[g] / len(embers),
+                'terminal_velocity': self._calculate_terminal_velocity(avg_mass)
+            })
 
         return classifications
 
@@ -317,46 +486,64 @@ class QuantumRandomWalkEmber:
     ) -> Dict[str, np.ndarray]:
         """Execute quantum walk for specific ember type"""
 
-        # Simplified execution (would use actual Classiq execution)
-        landing_map = np.zeros((self.grid_size, self.grid_size))
-
-        # Mock quantum results with realistic physics
-        for i in range(self.grid_size):
-            for j in range(self.grid_size):
-                # Distance from fire source
-                distance = np.sqrt((i - self.grid_size / 2) ** 2 + (j - self.grid_size / 2) ** 2)
-                distance_km = distance * self.max_distance / self.grid_size
+        # Mean horizontal wind, reduced once per call (None without a wind field)
+        wind_dir = self._mean_wind_direction(wind_field)
 
-                # Probability decreases with distance
-                base_prob = np.exp(-distance_km / 5)  # 5km characteristic distance
+        # Simplified execution (would use actual Classiq execution)
+        # Mock quantum results with realistic physics, evaluated over the whole grid
+        # Distance from fire source (float32 map pipeline)
+        distance_km = self._distance_km_grid
+        mass = np.float32(ember_type['mass'])
 
-                # Wind effect
-                wind_boost = 1.0
-                if hasattr(wind_field, 'shape') and wind_field.size > 0:
-                    # Wind direction alignment
-                    wind_dir = np.mean(wind_field[:, :, :2], axis=(0, 1))
-                    ember_dir = np.array([i - self.grid_size / 2, j - self.grid_size / 2])
+        # Probability decreases with distance
+        base_prob = np.exp(-distance_km / 5)  # 5km characteristic distance
 
-                    if np.linalg.norm(ember_dir) > 0:
-                        ember_dir = ember_dir / np.linalg.norm(ember_dir)
-                        wind_alignment = np.dot(wind_dir, ember_dir)
-                        wind_boost = 1 + wind_alignment * 0.5
+        # Wind effect
+        wind_boost = 1.0
+        if wind_dir is not None:
+            # Wind direction alignment
+            wind_alignment = self._grid_ux * wind_dir[0] + self._grid_uy * wind_dir[1]
+            wind_boost = 1 + wind_alignment * 0.5
 
-                # Mass effect (heavier embers don't travel as far)
-                mass_factor = np.exp(-ember_type['mass'] * distance_km / 10)
+        # Mass effect (heavier embers don't travel as far)
+        mass_factor = np.exp(-mass * distance_km / 10)
 
-                # Survival probability
-                flight_time = distance_km * 1000 / 10  # Assuming 10 m/s average
-                survival = np.exp(-flight_time / (300 * ember_type['mass']))  # Empirical
+        # Survival probability
+        flight_time = distance_km * 1000 / 10  # Assuming 10 m/s average
+        survival = np.exp(-flight_time / (300 * mass))  # Empirical
 
-                landing_map[i, j] = base_prob * wind_boost * mass_factor * survival
+        landing_map = base_prob * wind_boost * mass_factor * survival
 
-        # Normalize
-        if np.sum(landing_map) > 0:
-            landing_map = landing_map / np.sum(landing_map)
+        # Normalize in place (single reduction)
+        total = landing_map.sum()
+        if total > 0:
+            np.multiply(landing_map, 1 / total, out=landing_map)
 
         return {'landing_map': landing_map}
 
+    def _fused_landing_map(self, ember_types: List[Dict], wind_field: np.ndarray) -> np.ndarray:
+        """Weighted landing map of all ember types via the fused Numba kernel"""
+        wind_dir = self._mean_wind_direction(wind_field)
+        wind_x, wind_y = (0.0, 0.0) if wind_dir is None else (float(wind_dir[0]), float(wind_dir[1]))
+
+        # Mass effect and survival share one exponent: exp(-d * (m / 10 + 1 / (3 m)))
+        masses = np.array([ember_type['mass'] for ember_type in ember_types], dtype=np.float64)
+        decay = masses / 10 + 100 / (300 * masses)
+        weights = np.array([ember_type['weight'] for ember_type in ember_types], dtype=np.float64)
+
+        landing_map = np.empty((self.grid_size, self.grid_size), dtype=np.float32)
+        _landing_kernel(self._distance_km_grid, self._grid_ux, self._grid_uy,
+                        wind_x, wind_y, decay, weights, landing_map)
+        return landing_map
+
+    def _mean_wind_direction(self, wind_field: Any) -> Optional[np.ndarray]:
+        """Grid-mean horizontal wind vector of an (nx, ny, >=2) field, or None if absent"""
+        if not hasattr(wind_field, 'shape') or wind_field.size == 0:
+            return None
+        if wind_field.ndim != 3 or wind_field.shape[2] < 2:
+            raise ValueError(f"wind_field must have shape (nx, ny, >=2), got {wind_field.shape}")
+        return np.mean(wind_field[:, :, :2], axis=(0, 1)).astype(np.float32)
+
     def _calculate_ignition_risks(
             self,
             landing_probabilities: np.ndarray,
@@ -365,27 +552,30 @@ class QuantumRandomWalkEmber:
         """Calculate ignition probability at each location"""
 
         # Get conditions
-        humidity = atmospheric_conditions.get('humidity_field', np.full(landing_probabilities.shape, 50))
+        humidity = atmospheric_conditions.get('humidity_field', 50)
         fuel_moisture = atmospheric_conditions.get('fuel_moisture', 10)
 
-        # Ignition probability model
-        ignition_map = np.zeros_like(landing_probabilities)
-
-        for i in range(ignition_map.shape[0]):
-            for j in range(ignition_map.shape[1]):
-                if landing_probabilities[i, j] > 0:
-                    # Humidity effect
-                    humidity_factor = 1 - (humidity[i, j] if hasattr(humidity, 'shape') else humidity) / 100
+        # Humidity effect (cast once so the float32 maps are not upcast);
+        # uniform humidity stays a scalar and broadcasts instead of filling a grid
+        if hasattr(humidity, 'shape'):
+            humidity_factor = 1 - np.asarray(humidity, dtype=np.float32) / 100
+        else:
+            humidity_factor = 1 - np.float32(humidity) / 100
 
-                    # Fuel moisture effect
-                    moisture_factor = np.exp(-fuel_moisture / 10)
+        # Fuel moisture effect
+        moisture_factor = np.float32(np.exp(-fuel_moisture / 10))
 
-                    # Ember density effect
-                    density_factor = 1 - np.exp(-landing_probabilities[i, j] * 100)
+        # Ember density effect (-expm1(-x) == 1 - exp(-x), accurate for small x)
+        density_factor = -np.expm1(-landing_probabilities * 100)
 
-                    ignition_map[i, j] = humidity_factor * moisture_factor * density_factor
+        # Ignition probability model
+        ignition_map = np.where(
+            landing_probabilities > 0,
+            humidity_factor * moisture_factor * density_factor,
+            0.0
+        )
 
-        return ignition_map
+        return ignition_map.astype(np.float32, copy=False)
 
     def _detect_ember_jumps(
             self,
@@ -394,32 +584,34 @@ class QuantumRandomWalkEmber:
     ) -> List[Dict[str, Any]]:
         """Detect significant ember transport events"""
 
-        jumps = []
-        source_x = self.grid_size // 2
-        source_y = self.grid_size // 2
-
         # Find peaks in landing probability
-        from scipy.ndimage import maximum_filter
-        local_maxima = (landing_map == maximum_filter(landing_map, size=3))
-
-        for i in range(landing_map.shape[0]):
-            for j in range(landing_map.shape[1]):
-                if local_maxima[i, j] and landing_map[i, j] > 0.01:
-                    distance = np.sqrt((i - source_x) ** 2 + (j - source_y) ** 2)
-                    distance_km = distance * self.max_distance / self.grid_size
-
-                    if distance_km > 1:  # Significant jump
-                        jumps.append({
-                            'grid_position': (i, j),
-                            'distance_km': distance_km,
-                            'landing_probability': float(landing_map[i, j]),
-                            'threat_level': 'high' if landing_map[i, j] > 0.05 else 'medium'
-                        })
-
-        # Sort by distance
-        jumps.sort(key=lambda x: x['distance_km'], reverse=True)
-
-        return jumps
+        # 3x3 neighborhood max as two separable 1-D passes
+        neighborhood_max = np.empty_like(landing_map)
+        ndi.maximum_filter1d(landing_map, size=3, axis=0, output=neighborhood_max, mode='constant', cval=0)
+        ndi.maximum_filter1d(neighborhood_max, size=3, axis=1, output=neighborhood_max, mode='constant', cval=0)
+        local_maxima = (landing_map == neighborhood_max)
+        peak_mask = local_maxima & (landing_map > 0.01)
+
+        coords = np.argwhere(peak_mask)
+        distances_km = self._distance_km_grid[peak_mask]
+        probabilities = landing_map[peak_mask]
+
+        # Significant jumps, sorted by distance
+        significant = distances_km > 1
+        order = np.argsort(-distances_km[significant], kind='stable')
+        coords = coords[significant][order]
+        distances_km = distances_km[significant][order]
+        probabilities = probabilities[significant][order]
+
+        return [
+            {
+                'grid_position': (int(i), int(j)),
+                'distance_km': float(distance_km),
+                'landing_probability': float(probability),
+                'threat_level': 'high' if probability > 0.05 else 'medium'
+            }
+            for (i, j), distance_km, probability in zip(coords, distances_km, probabilities)
+        ]
 
     def _identify_ignition_zones(
             self,
@@ -432,217 +624,210 @@ class QuantumRandomWalkEmber:
         high_risk_mask = ignition_map > threshold
 
         if np.any(high_risk_mask):
-            from scipy.ndimage import label
-            labeled, num_features = label(high_risk_mask)
-
-            for i in range(1, num_features + 1):
-                zone_mask = labeled == i
-                zone_size = np.sum(zone_mask)
-
-                if zone_size > 1:  # Significant zone
-                    center = np.array(np.where(zone_mask)).mean(axis=1)
-                    max_risk = np.max(ignition_map[zone_mask])
-
-                    zones.append({
-                        'id': i,
-                        'center_grid': (int(center[0]), int(center[1])),
-                        'size_cells': int(zone_size),
-                        'max_ignition_probability': float(max_risk),
-                        'risk_level': 'extreme' if max_risk > 0.8 else 'high' if max_risk > 0.5 else 'medium'
-                    })
-
-                    return zones
-
-                def _calculate_max_distance(self, landing_probabilities: np.ndarray) -> float:
-                    """Calculate maximum transport distance with significant probability"""
-                    max_distance = 0.0
-
-                    for i in range(landing_probabilities.shape[0]):
-                        for j in range(landing_probabilities.shape[1]):
-                            if landing_probabilities[i, j] > 0.01:  # 1% probability threshold
-                                center_x, center_y = self.grid_size // 2, self.grid_size // 2
-                                distance = np.sqrt((i - center_x) ** 2 + (j - center_y) ** 2)
-                                distance_km = distance * self.max_distance / self.grid_size
-                                max_distance = max(max_distance, distance_km)
-
-                    return max_distance
-
-                def _check_paradise_conditions(self, ember_jumps: List[Dict[str, Any]]) -> bool:
-                    """Check if conditions similar to Paradise Fire are detected"""
-                    # Paradise Fire conditions: ember jump > 10km with high probability
-                    for jump in ember_jumps:
-                        if (jump['distance_km'] > 10 and
-                                jump['landing_probability'] > 0.03 and
-                                jump['threat_level'] == 'high'):
-                            return True
-                    return False
-
-                # Additional helper functions needed for the quantum circuit
-                def encode_position(initial_pos: int, position_qubits: "QArray[QBit]"):
-                    """Encode initial position into quantum register"""
-                    # Convert integer position to binary and apply X gates
-                    for i, bit in enumerate(format(initial_pos, f'0{len(position_qubits)}b')):
-                        if bit == '1':
-                            X(position_qubits[i])
-
-                def shift_position(position: "QArray[QBit]", direction: int):
-                    """Shift position based on direction (0-5 for 3D movement)"""
-                    # Simplified quantum position shift
-                    # In a full implementation, this would handle 3D grid movements
-                    if direction < len(position):
-                        X(position[direction])
-
-                def extract_wind_component(wind: "QArray[QBit]", time_step: int) -> List[float]:
-                    """Extract wind components from quantum register"""
-                    # Mock implementation - in reality would decode quantum wind state
-                    # Returns normalized wind components [x, y, z]
-                    base_strength = 0.1 * (time_step % 10)  # Vary with time
-                    return [base_strength, base_strength * 0.5, -base_strength * 0.2]
-
-                def measure_positions(position: "QArray[QBit]", output: "Output[QArray[QBit]]"):
-                    """Measure final positions of embers"""
-                    for i in range(len(position)):
-                        CX(position[i], output[i])
-
-                    # Additional methods to complete the industrial-grade implementation
-                    def get_performance_metrics(self) -> Dict[str, Any]:
-                        """Get comprehensive performance metrics for the quantum model"""
-                        return {
-                            'grid_dimensions': f"{self.grid_size}x{self.grid_size}x{self.height_levels}",
-                            'total_qubits': self.total_qubits,
-                            'position_qubits': self.position_qubits,
-                            'coin_qubits': self.coin_qubits,
-                            'max_embers_supported': 10000,
-                            'quantum_advantage_factor': 2 ** (self.position_qubits / 2),
-                            'estimated_classical_time': '45+ minutes',
-                            'quantum_execution_time': '~1.5 minutes'
-                        }
-
-                    async def validate_with_historical_data(
-                            self,
-                            historical_scenarios: List[Dict[str, Any]]
-                    ) -> Dict[str, float]:
-                        """Validate model against historical ember transport events"""
-                        validation_results = {
-                            'accuracy': 0.0,
-                            'precision': 0.0,
-                            'recall': 0.0,
-                            'f1_score': 0.0
-                        }
-
-                        if not historical_scenarios:
-                            return validation_results
-
-                        correct_predictions = 0
-                        total_predictions = 0
-
-                        for scenario in historical_scenarios:
-                            # Run prediction on historical conditions
-                            result = await self.simulate_ember_transport(
-                                scenario['fire_source'],
-                                scenario['wind_conditions'],
-                                scenario['atmospheric_conditions'],
-                                scenario['duration_minutes']
-                            )
-
-                            # Compare with actual outcome
-                            predicted_jumps = result['ember_jumps']
-                            actual_jumps = scenario['actual_ember_events']
-
-                            # Simple accuracy calculation
-                            for actual_jump in actual_jumps:
-                                predicted_correctly = any(
-                                    abs(pred['distance_km'] - actual_jump['distance_km']) < 2.0
-                                    for pred in predicted_jumps
-                                )
-                                if predicted_correctly:
-                                    correct_predictions += 1
-                                total_predictions += 1
-
-                        if total_predictions > 0:
-                            validation_results['accuracy'] = correct_predictions / total_predictions
-                            # Additional metrics would be calculated similarly
-                            validation_results['precision'] = validation_results['accuracy']  # Simplified
-                            validation_results['recall'] = validation_results['accuracy']
-                            validation_results['f1_score'] = validation_results['accuracy']
-
-                        return validation_results
-
-                    async def export_visualization_data(
-                            self,
-                            simulation_result: Dict[str, Any]
-                    ) -> Dict[str, Any]:
-                        """Export data for 3D visualization in the frontend"""
-                        return {
-                            'ember_trajectories': self._generate_trajectory_data(simulation_result),
-                            'landing_heatmap': simulation_result['landing_probability_map'].tolist(),
-                            'ignition_zones': simulation_result['high_risk_zones'],
-                            'wind_field_vectors': self._generate_wind_vectors(),
-                            'timeline_data': self._generate_timeline_data(simulation_result),
-                            'visualization_config': {
-                                'grid_size': self.grid_size,
-                                'max_distance_km': self.max_distance,
-                                'color_scale': 'plasma',
-                                'animation_duration': 30000  # 30 seconds
-                            }
-                        }
-
-                    def _generate_trajectory_data(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
-                        """Generate 3D trajectory data for visualization"""
-                        trajectories = []
-
-                        # Create sample trajectories based on ember jumps
-                        for i, jump in enumerate(result.get('ember_jumps', [])[:50]):  # Limit to 50 for performance
-                            trajectory = {
-                                'id': f'ember_{i}',
-                                'path': [
-                                    {'x': 0, 'y': 0, 'z': 10, 't': 0},  # Start
-                                    {
-                                        'x': jump['grid_position'][0] - self.grid_size // 2,
-                                        'y': jump['grid_position'][1] - self.grid_size // 2,
-                                        'z': 0,
-                                        't': jump['distance_km'] * 60 / 10  # Approximate time
-                                    }
-                                ],
-                                'probability': jump['landing_probability'],
-                                'threat_level': jump['threat_level']
-                            }
-                            trajectories.append(trajectory)
-
-                        return trajectories
-
-                    def _generate_wind_vectors(self) -> List[Dict[str, float]]:
-                        """Generate wind vector field for visualization"""
-                        vectors = []
-                        step = self.grid_size // 10  # 10x10 wind vector grid
-
-                        for i in range(0, self.grid_size, step):
-                            for j in range(0, self.grid_size, step):
-                                # Mock wind vector (would use actual wind field)
-                                vectors.append({
-                                    'x': i - self.grid_size // 2,
-                                    'y': j - self.grid_size // 2,
-                                    'z': 5,
-                                    'u': np.random.normal(3, 1),  # Wind speed in x
-                                    'v': np.random.normal(2, 1),  # Wind speed in y
-                                    'w': np.random.normal(0, 0.5)  # Wind speed in z
-                                })
-
-                        return vectors
-
-                    def _generate_timeline_data(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
-                        """Generate timeline data for the simulation"""
-                        timeline = []
-                        duration = result['metadata']['duration_minutes']
-                        time_steps = result['metadata']['time_steps']
-
-                        for step in range(time_steps):
-                            time_point = {
-                                'time_minutes': (step * duration) / time_steps,
-                                'active_embers': max(100 - step * 10, 10),  # Decreasing over time
-                                'max_height_m': max(100 - step * 5, 0),
-                                'spread_radius_km': min(step * 0.5, result['max_transport_distance_km'])
-                            }
-                            timeline.append(time_point)
-
-                        return timeline
+            labeled = np.empty(high_risk_mask.shape, dtype=np.int32)
+            num_features = ndi.label(high_risk_mask, structure=ZONE_CONNECTIVITY, output=labeled)
+
+            # Per-zone reductions over all labels at once
+            labels = np.arange(1, num_features + 1)
+            sizes = np.bincount(labeled.ravel(), minlength=num_features + 1)[1:]
+            centers = ndi.center_of_mass(high_risk_mask, labeled, labels)
+            max_risks = ndi.maximum(ignition_map, labeled, labels)
+
+            zones = [
+                {
+                    'id': int(zone_id),
+                    'center_grid': (int(center[0]), int(center[1])),
+                    'size_cells': int(zone_size),
+                    'max_ignition_probability': float(max_risk),
+                    'risk_level': 'extreme' if max_risk > 0.8 else 'high' if max_risk > 0.5 else 'medium'
+                }
+                for zone_id, zone_size, center, max_risk in zip(labels, sizes, centers, max_risks)
+                if zone_size > 1  # Significant zone
+            ]
+
+        return zones
+
+    def _calculate_max_distance(self, landing_probabilities: np.ndarray) -> float:
+        """Calculate maximum transport distance with significant probability"""
+        mask = landing_probabilities > 0.01  # 1% probability threshold
+        return float(self._distance_km_grid[mask].max()) if mask.any() else 0.0
+
+    def _check_paradise_conditions(self, ember_jumps: List[Dict[str, Any]]) -> bool:
+        """Check if conditions similar to Paradise Fire are detected"""
+        # Paradise Fire conditions: ember jump > 10km with high probability
+        for jump in ember_jumps:
+            if (jump['distance_km'] > 10 and
+                    jump['landing_probability'] > 0.03 and
+                    jump['threat_level'] == 'high'):
+                return True
+        return False
+
+    # Additional methods to complete the industrial-grade implementation
+    def get_performance_metrics(self) -> Dict[str, Any]:
+        """Get comprehensive performance metrics for the quantum model"""
+        return {
+            'grid_dimensions': f"{self.grid_size}x{self.grid_size}x{self.height_levels}",
+            'total_qubits': self.total_qubits,
+            'position_qubits': self.position_qubits,
+            'coin_qubits': self.coin_qubits,
+            'max_embers_supported': 10000,
+            'quantum_advantage_factor': 2 ** (self.position_qubits / 2),
+            'estimated_classical_time': '45+ minutes',
+            'quantum_execution_time': '~1.5 minutes'
+        }
+
+    async def validate_with_historical_data(
+            self,
+            historical_scenarios: List[Dict[str, Any]]
+    ) -> Dict[str, float]:
+        """Validate model against historical ember transport events"""
+        validation_results = {
+            'accuracy': 0.0,
+            'precision': 0.0,
+            'recall': 0.0,
+            'f1_score': 0.0
+        }
+
+        if not historical_scenarios:
+            return validation_results
+
+        correct_predictions = 0
+        total_predictions = 0
+
+        for scenario in historical_scenarios:
+            # Run prediction on historical conditions
+            result = await self.simulate_ember_transport(
+                scenario['fire_source'],
+                scenario['wind_conditions'],
+                scenario['atmospheric_conditions'],
+                scenario['duration_minutes']
+            )
+
+            # Compare with actual outcome
+            predicted_jumps = result['ember_jumps']
+            actual_jumps = scenario['actual_ember_events']
+
+            # Simple accuracy calculation
+            for actual_jump in actual_jumps:
+                predicted_correctly = any(
+                    abs(pred['distance_km'] - actual_jump['distance_km']) < 2.0
+                    for pred in predicted_jumps
+                )
+                if predicted_correctly:
+                    correct_predictions += 1
+                total_predictions += 1
+
+        if total_predictions > 0:
+            validation_results['accuracy'] = correct_predictions / total_predictions
+            # Additional metrics would be calculated similarly
+            validation_results['precision'] = validation_results['accuracy']  # Simplified
+            validation_results['recall'] = validation_results['accuracy']
+            validation_results['f1_score'] = validation_results['accuracy']
+
+        return validation_results
+
+    async def export_visualization_data(
+            self,
+            simulation_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Export data for 3D visualization in the frontend"""
+        return {
+            'ember_trajectories': self._generate_trajectory_data(simulation_result),
+            'landing_heatmap': simulation_result['landing_probability_map'].tolist(),
+            'ignition_zones': simulation_result['high_risk_zones'],
+            'wind_field_vectors': self._generate_wind_vectors(),
+            'timeline_data': self._generate_timeline_data(simulation_result),
+            'visualization_config': {
+                'grid_size': self.grid_size,
+                'max_distance_km': self.max_distance,
+                'color_scale': 'plasma',
+                'animation_duration': 30000  # 30 seconds
+            }
+        }
+
+    def _generate_trajectory_data(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Generate 3D trajectory data for visualization"""
+        trajectories = []
+
+        # Create sample trajectories based on ember jumps
+        for i, jump in enumerate(result.get('ember_jumps', [])[:50]):  # Limit to 50 for performance
+            trajectory = {
+                'id': f'ember_{i}',
+                'path': [
+                    {'x': 0, 'y': 0, 'z': 10, 't': 0},  # Start
+                    {
+                        'x': jump['grid_position'][0] - self.grid_size // 2,
+                        'y': jump['grid_position'][1] - self.grid_size // 2,
+                        'z': 0,
+                        't': jump['distance_km'] * 60 / 10  # Approximate time
+                    }
+                ],
+                'probability': jump['landing_probability'],
+                'threat_level': jump['threat_level']
+            }
+            trajectories.append(trajectory)
+
+        return trajectories
+
+    def _generate_wind_vectors(self) -> List[Dict[str, float]]:
+        """Generate wind vector field for visualization"""
+        step = self.grid_size // 10  # 10x10 wind vector grid
+        coords = np.arange(0, self.grid_size, step) - self.grid_size // 2
+        x, y = np.meshgrid(coords, coords, indexing='ij')
+
+        # Mock wind vectors (would use actual wind field): u, v, w wind speeds
+        uvw = self._rng.normal([3, 2, 0], [1, 1, 0.5], size=(x.size, 3))
+
+        return [
+            {'x': xi, 'y': yi, 'z': 5, 'u': u, 'v': v, 'w': w}
+            for xi, yi, (u, v, w) in zip(x.ravel().tolist(), y.ravel().tolist(), uvw.tolist())
+        ]
+
+    def _generate_timeline_data(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Generate timeline data for the simulation"""
+        timeline = []
+        duration = result['metadata']['duration_minutes']
+        time_steps = result['metadata']['time_steps']
+
+        for step in range(time_steps):
+            time_point = {
+                'time_minutes': (step * duration) / time_steps,
+                'active_embers': max(100 - step * 10, 10),  # Decreasing over time
+                'max_height_m': max(100 - step * 5, 0),
+                'spread_radius_km': min(step * 0.5, result['max_transport_distance_km'])
+            }
+            timeline.append(time_point)
+
+        return timeline
+
+
+# Additional helper functions needed for the quantum circuit
+def encode_position(initial_pos: int, position_qubits: "QArray[QBit]"):
+    """Encode initial position into quantum register"""
+    # Apply X gates on the set bits of the integer position, most significant first
+    n = len(position_qubits)
+    for i in range(n):
+        if (initial_pos >> (n - 1 - i)) & 1:
+            X(position_qubits[i])
+
+
+def shift_position(position: "QArray[QBit]", direction: int):
+    """Shift position based on direction (0-5 for 3D movement)"""
+    # Simplified quantum position shift
+    # In a full implementation, this would handle 3D grid movements
+    if direction < len(position):
+        X(position[direction])
+
+
+def extract_wind_component(wind: "QArray[QBit]", time_step: int) -> List[float]:
+    """Extract wind components from quantum register"""
+    # Mock implementation - in reality would decode quantum wind state
+    # Returns normalized wind components [x, y, z]
+    base_strength = 0.1 * (time_step % 10)  # Vary with time
+    return [base_strength, base_strength * 0.5, -base_strength * 0.2]
+
+
+def measure_positions(position: "QArray[QBit]", output: "Output[QArray[QBit]]"):
+    """Measure final positions of embers"""
+    for i in range(len(position)):
+        CX(position[i], output[i])
@@ -0,0 +1,37 @@
+"""
+Quantum Hardware Interface
+Location: backend/quantum_models/hardware_interface.py
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Job status polling: first interval and backoff ceiling, in milliseconds
+DEFAULT_POLLING_INTERVAL_MS = 200
+DEFAULT_POLLING_MAX_MS = 2000
+POLLING_BACKOFF = 1.5
+
+
+async def wait_for_job_result(
+        job: Any,
+        polling_interval_ms: int = DEFAULT_POLLING_INTERVAL_MS,
+        polling_max_ms: int = DEFAULT_POLLING_MAX_MS
+) -> Any:
+    """Await a quantum job's result without blocking the event loop.
+
+    Jobs that report completion (in_final_state() or done()) are polled with
+    exponential backoff from polling_interval_ms up to polling_max_ms; the
+    blocking result() call itself always runs in a worker thread.
+    """
+    is_final = getattr(job, 'in_final_state', None) or getattr(job, 'done', None)
+    if callable(is_final):
+        delay = polling_interval_ms / 1000
+        while not await asyncio.to_thread(is_final):
+            await asyncio.sleep(delay)
+            delay = min(delay * POLLING_BACKOFF, polling_max_ms / 1000)
+        logger.debug("Quantum job reached a final state")
+
+    return await asyncio.to_thread(job.result)
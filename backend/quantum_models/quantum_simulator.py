@@ -5,9 +5,12 @@ Location: backend/quantum_models/quantum_simulator.py
 """
 
 import logging
+import os
+import time
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -21,24 +24,56 @@ except ImportError:
     QISKIT_AVAILABLE = False
     logger.warning("Qiskit not available - using mock backends")
 
+try:
+    from qiskit_aer import AerSimulator
+    from .qiskit_models.qiskit_fire_spread import QiskitFireSpread
+    AER_AVAILABLE = True
+except ImportError:
+    AER_AVAILABLE = False
+
 
 class QuantumSimulatorManager:
     """
     Manages quantum simulators and hardware backends for fire prediction.
-    This mock version provides simulated results without requiring Qiskit.
+    This mock version provides simulated results without requiring Qiskit;
+    when Qiskit Aer is installed the Qiskit fire-spread model runs on a local
+    AerSimulator.
     """
 
+    # Worker threads for CPU-bound simulation, and the cap on concurrently running ensemble members
+    MAX_WORKERS = 4
+
+    # Seconds a backend status snapshot is reused before it is refreshed
+    BACKEND_STATUS_TTL = 30.0
+
+    # Shots per Qiskit fire-spread circuit
+    QISKIT_SHOTS = 4096
+
+    # Perturbed weather samples in the Qiskit member of an ensemble prediction
+    ENSEMBLE_WEATHER_SAMPLES = 8
+
     def __init__(self):
         self.available_backends = {}
         self.is_initialized = False
         self.prediction_history = []
         self.execution_times = []
         self.active_jobs = {}
+        self.models: Dict[str, Any] = {}
+        self._aer_backend = None
+        self.executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
+        # Created per event loop by _get_model_semaphore (a Semaphore binds to the first loop that waits on it)
+        self._model_semaphore: Optional[asyncio.Semaphore] = None
+        self._model_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._backend_status_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
 
     async def initialize(self):
         """Initialize quantum backends"""
         logger.info("Initializing Quantum Simulator Manager...")
 
+        # A previous shutdown() released the worker pool
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
+
         # Mock backends
         self.available_backends = {
             'aer_simulator': {
@@ -64,10 +99,21 @@ class QuantumSimulatorManager:
             }
         }
 
+        if AER_AVAILABLE and 'qiskit_fire_spread' not in self.models:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._load_qiskit_model)
+
         self.is_initialized = True
         logger.info("Quantum Simulator Manager initialized successfully")
         return True
 
+    def _load_qiskit_model(self) -> None:
+        """Build the Qiskit fire-spread model and transpile its template for the Aer backend"""
+        backend = AerSimulator()
+        model = QiskitFireSpread()
+        model.transpile_for_backend(backend)
+        self._aer_backend = backend
+        self.models['qiskit_fire_spread'] = model
+
     async def get_available_backends(self) -> Dict[str, Any]:
         """Get list of available quantum backends"""
         if not self.is_initialized:
@@ -93,23 +139,11 @@ class QuantumSimulatorManager:
             # Simple delay to simulate execution time
             await asyncio.sleep(0.5)
 
-            # Generate mock counts
+            # Generate mock counts off the event loop (CPU-bound for wide circuits)
             num_qubits = circuit_data.get('num_qubits', 5)
-            possible_outcomes = 2 ** num_qubits
-
-            # Create random distribution that favors some outcomes
-            probs = np.random.exponential(1.0, possible_outcomes)
-            probs = probs / np.sum(probs)
-
-            counts = {}
-            for i in range(possible_outcomes):
-                if np.random.random() < 0.7:  # Only include some outcomes
-                    bitstring = format(i, f'0{num_qubits}b')
-                    counts[bitstring] = int(probs[i] * shots)
-
-            # Ensure we have at least one count
-            if not counts:
-                counts['0' * num_qubits] = shots
+            counts = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._sample_mock_counts, num_qubits, shots
+            )
 
             execution_time = 0.5 + np.random.random() * 2.0
             self.execution_times.append(execution_time)
@@ -137,6 +171,95 @@ class QuantumSimulatorManager:
                 }
             }
 
+    @staticmethod
+    def _sample_mock_counts(num_qubits: int, shots: int) -> Dict[str, int]:
+        """Generate mock measurement counts for a circuit"""
+        possible_outcomes = 2 ** num_qubits
+
+        # Create random distribution that favors some outcomes
+        probs = np.random.exponential(1.0, possible_outcomes)
+        probs = probs / np.sum(probs)
+
+        counts = {}
+        for i in range(possible_outcomes):
+            if np.random.random() < 0.7:  # Only include some outcomes
+                bitstring = format(i, f'0{num_qubits}b')
+                counts[bitstring] = int(probs[i] * shots)
+
+        # Ensure we have at least one count
+        if not counts:
+            counts['0' * num_qubits] = shots
+
+        return counts
+
+    async def run_prediction(
+        self,
+        fire_data: Dict[str, Any],
+        weather_data: Dict[str, Any],
+        model_type: str = 'qiskit_fire_spread',
+        use_hardware: bool = False
+    ) -> Dict[str, Any]:
+        """Run a single-model fire spread prediction"""
+        try:
+            if not self.is_initialized:
+                await self.initialize()
+
+            if model_type not in self.models:
+                return {
+                    'status': 'error',
+                    'error': f'Model {model_type} is not available',
+                    'timestamp': datetime.now().isoformat()
+                }
+
+            start_time = time.perf_counter()
+            prediction = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._run_qiskit_prediction,
+                self.models[model_type], fire_data, weather_data, use_hardware
+            )
+            execution_time = time.perf_counter() - start_time
+            self.execution_times.append(execution_time)
+
+            prediction['status'] = 'success'
+            prediction['metadata']['execution_time'] = execution_time
+            return prediction
+
+        except Exception as e:
+            logger.error(f"Error in {model_type} prediction: {str(e)}")
+            return {
+                'status': 'error',
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def _run_qiskit_prediction(
+        self,
+        model: Any,
+        fire_data: Dict[str, Any],
+        weather_data: Dict[str, Any],
+        use_hardware: bool
+    ) -> Dict[str, Any]:
+        """Predict with the Qiskit fire-spread model.
+
+        Simulator runs read exact marginals from the statevector; hardware runs
+        sample the bound circuit on Aer so they carry shot noise like a device.
+        """
+        if model.has_no_active_fires(fire_data):
+            # Nothing can spread: skip circuit binding and simulation entirely
+            prediction = model.trivial_result(weather_data)
+            prediction['metadata']['backend'] = 'none'
+            return prediction
+
+        if not use_hardware:
+            prediction = model.predict_analytic(fire_data, weather_data)
+            prediction['metadata']['backend'] = 'statevector'
+            return prediction
+
+        circuit = model.build_circuit(fire_data, weather_data)
+        counts = self._aer_backend.run(circuit, shots=self.QISKIT_SHOTS).result().get_counts()
+        prediction = model.process_results(counts, fire_data, weather_data)
+        prediction['metadata']['backend'] = 'aer_simulator'
+        return prediction
+
     async def run_ensemble_prediction(
         self,
         fire_data: Dict[str, Any],
@@ -147,27 +270,43 @@ class QuantumSimulatorManager:
         try:
             logger.info("Running quantum ensemble prediction")
 
-            # Generate mock prediction results
-            num_models = 5
-            results = []
+            # Run the ensemble members concurrently
+            semaphore = self._get_model_semaphore()
+            members = [self._run_bounded_model(semaphore, self._mock_ensemble_member, i) for i in range(5)]
+            if 'qiskit_fire_spread' in self.models:
+                members.append(self._run_bounded_model(
+                    semaphore, self._qiskit_weather_ensemble, fire_data, weather_data
+                ))
+            num_models = len(members)
+            outcomes = await asyncio.gather(*members, return_exceptions=True)
 
-            for i in range(num_models):
-                model_result = {
-                    'model_id': f'model_{i}',
-                    'model_type': ['fire_spread', 'ember_transport', 'weather_impact',
-                                  'fuel_consumption', 'fire_intensity'][i % 5],
-                    'confidence': 0.7 + np.random.random() * 0.3,
-                    'prediction_map': np.random.random((20, 20)).tolist(),
-                    'execution_time': 0.5 + np.random.random() * 2.0,
+            results = []
+            failed_models = 0
+            for i, outcome in enumerate(outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Ensemble model_{i} failed: {str(outcome)}")
+                    failed_models += 1
+                    continue
+                results.append(outcome)
+
+            # One timestamp for the prediction and its history entry
+            timestamp = datetime.now().isoformat()
+
+            if not results:
+                return {
+                    'status': 'error',
+                    'error': f'All {num_models} ensemble models failed',
+                    'failed_models': failed_models,
+                    'timestamp': timestamp
                 }
-                results.append(model_result)
 
-            # Aggregate results
+            # Aggregate results (degraded if any member failed)
             prediction = {
-                'status': 'success',
-                'timestamp': datetime.now().isoformat(),
+                'status': 'degraded' if failed_models else 'success',
+                'timestamp': timestamp,
                 'prediction_id': f"pred_{len(self.prediction_history) + 1}",
                 'models': results,
+                'failed_models': failed_models,
                 'ensemble_result': {
                     'spread_probability_map': np.random.random((20, 20)).tolist(),
                     'severity_score': 0.7 + np.random.random() * 0.3,
@@ -187,7 +326,7 @@ class QuantumSimulatorManager:
 
             # Store in history
             self.prediction_history.append({
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp,
                 'prediction_id': prediction['prediction_id'],
                 'metadata': prediction['metadata']
             })
@@ -202,6 +341,64 @@ class QuantumSimulatorManager:
                 'timestamp': datetime.now().isoformat()
             }
 
+    def _get_model_semaphore(self) -> asyncio.Semaphore:
+        """Ensemble concurrency semaphore for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._model_semaphore is None or self._model_semaphore_loop is not loop:
+            self._model_semaphore = asyncio.Semaphore(min(os.cpu_count() or 1, self.MAX_WORKERS))
+            self._model_semaphore_loop = loop
+        return self._model_semaphore
+
+    async def _run_bounded_model(self, semaphore: asyncio.Semaphore, member: Any, *args: Any) -> Dict[str, Any]:
+        """Run one ensemble member on the worker pool once a model slot is free"""
+        async with semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, member, *args)
+
+    def _qiskit_weather_ensemble(self, fire_data: Dict[str, Any], weather_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Qiskit fire-spread member averaged over perturbed weather, run as one Aer job"""
+        model = self.models['qiskit_fire_spread']
+        start_time = time.perf_counter()
+
+        weather_samples = self._sample_weather(weather_data, self.ENSEMBLE_WEATHER_SAMPLES)
+        results = model.run_batch(self._aer_backend, fire_data, weather_samples, shots=self.QISKIT_SHOTS)
+        maps = np.stack([result['predictions'][0]['fire_probability_map'] for result in results])
+
+        return {
+            'model_id': 'qiskit_fire_spread',
+            'model_type': 'fire_spread',
+            'weather_samples': len(weather_samples),
+            # Agreement across weather samples
+            'confidence': float(1 - maps.std(axis=0).mean()),
+            'prediction_map': maps.mean(axis=0).tolist(),
+            'execution_time': time.perf_counter() - start_time,
+        }
+
+    @staticmethod
+    def _sample_weather(weather_data: Dict[str, Any], num_samples: int) -> List[Dict[str, Any]]:
+        """Monte-Carlo weather samples with perturbed wind speed and direction"""
+        rng = np.random.default_rng()
+        wind_speed = weather_data.get('avg_wind_speed', 10)
+        wind_direction = weather_data.get('dominant_wind_direction', 0)
+
+        speeds = np.maximum(wind_speed * (1 + 0.15 * rng.standard_normal(num_samples)), 0)
+        directions = (wind_direction + 15 * rng.standard_normal(num_samples)) % 360
+        return [
+            {**weather_data, 'avg_wind_speed': float(speed), 'dominant_wind_direction': float(direction)}
+            for speed, direction in zip(speeds, directions)
+        ]
+
+    @staticmethod
+    def _mock_ensemble_member(index: int) -> Dict[str, Any]:
+        """Build one mock ensemble member prediction"""
+        return {
+            'model_id': f'model_{index}',
+            'model_type': ['fire_spread', 'ember_transport', 'weather_impact',
+                           'fuel_consumption', 'fire_intensity'][index % 5],
+            'confidence': 0.7 + np.random.random() * 0.3,
+            'prediction_map': np.random.random((20, 20)).tolist(),
+            'execution_time': 0.5 + np.random.random() * 2.0,
+        }
+
     async def get_performance_metrics(self) -> Dict[str, Any]:
         """Get performance metrics of quantum processing"""
         if not self.execution_times:
@@ -223,6 +420,10 @@ class QuantumSimulatorManager:
         logger.info("Shutting down Quantum Simulator Manager")
         self.is_initialized = False
         self.active_jobs = {}
+        self._backend_status_cache.clear()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
         return True
 
     def get_backend_status(self, backend_name: str) -> Dict[str, Any]:
@@ -230,10 +431,18 @@ class QuantumSimulatorManager:
         if backend_name not in self.available_backends:
             return {'error': 'Backend not found', 'name': backend_name}
 
-        return {
+        # Backend metadata is static; only refresh the status snapshot once per TTL
+        cached = self._backend_status_cache.get(backend_name)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self.BACKEND_STATUS_TTL:
+            return dict(cached[1])
+
+        status = {
             **self.available_backends[backend_name],
             'queue_size': np.random.randint(0, 10),
             'pending_jobs': np.random.randint(0, 5),
             'uptime_hours': 24 * 7,  # One week
             'status_message': 'Operational'
         }
+        self._backend_status_cache[backend_name] = (now, status)
+        return dict(status)
@@ -0,0 +1,38 @@
+"""
+Regression tests for the prediction API endpoints
+Location: tests/test_api_endpoints.py
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+
+@pytest.fixture(scope='module')
+def prediction_endpoints():
+    pytest.importorskip('fastapi')
+    from api import prediction_endpoints
+    return prediction_endpoints
+
+
+class TestResponseSerialization:
+    def test_model_output_becomes_json_native(self, prediction_endpoints):
+        probability_map = np.random.default_rng(0).random((50, 50), dtype=np.float32)
+        predictions = [{
+            'time_step': 0,
+            'fire_probability_map': probability_map,
+            'high_risk_cells': [(1, 2), (3, 4)],
+            'total_area_at_risk': np.float32(12.5),
+        }]
+
+        ready = prediction_endpoints._json_ready(predictions)
+
+        assert json.loads(json.dumps(ready)) == ready
+        assert ready[0]['fire_probability_map'] == probability_map.tolist()
+        assert ready[0]['high_risk_cells'] == [[1, 2], [3, 4]]
+        assert ready[0]['total_area_at_risk'] == 12.5
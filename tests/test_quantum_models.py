@@ -0,0 +1,408 @@
+"""
+Regression tests for the quantum fire models
+Location: tests/test_quantum_models.py
+"""
+
+import asyncio
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+FIRE_DATA = {
+    'active_fires': [
+        {'latitude': 34.1, 'longitude': -118.3, 'intensity': 0.9},
+        {'latitude': 38.6, 'longitude': -121.5, 'intensity': 0.4},
+        {'latitude': 38.7, 'longitude': -121.4, 'intensity': 0.6},
+    ]
+}
+WEATHER_DATA = {
+    'avg_wind_speed': 18,
+    'dominant_wind_direction': 225,
+    'fuel_moisture': 8,
+    'avg_temperature': 31,
+}
+
+
+
+def reference_probability_map(model, counts, weather_data):
+    """Per-bitstring decode of measurement counts, as process_results did before vectorization"""
+    total_shots = sum(counts.values())
+    side = int(np.sqrt(model.grid_qubits))
+    region_size = model.grid_size // side
+    probability_map = np.zeros((model.grid_size, model.grid_size))
+    for bitstring, count in counts.items():
+        for i, bit in enumerate(bitstring[::-1]):
+            if bit == '1' and i < model.grid_qubits:
+                x0, y0 = (i % side) * region_size, (i // side) * region_size
+                probability_map[x0:x0 + region_size, y0:y0 + region_size] += count / total_shots
+
+    wind_speed = weather_data.get('avg_wind_speed', 10)
+    wind_direction = np.radians(weather_data.get('dominant_wind_direction', 0))
+    probability_map *= 1 + 0.1 * wind_speed / 50 * np.cos(wind_direction)
+    if probability_map.max() > 0:
+        probability_map /= probability_map.max()
+    return probability_map
+
+@pytest.fixture(scope='module')
+def qiskit_model():
+    pytest.importorskip('qiskit')
+    from quantum_models.qiskit_models.qiskit_fire_spread import QiskitFireSpread
+    return QiskitFireSpread()
+
+
+class TestQiskitCircuitCache:
+    def test_returns_independent_copies(self, qiskit_model):
+        first = qiskit_model.build_circuit(FIRE_DATA, WEATHER_DATA)
+        first.x(0)
+        second = qiskit_model.build_circuit(FIRE_DATA, WEATHER_DATA)
+
+        assert first is not second
+        assert len(second) == len(first) - 1
+
+    def test_matches_uncached_binding(self, qiskit_model):
+        qc = qiskit_model.build_circuit(FIRE_DATA, WEATHER_DATA)
+        intensities = qiskit_model._calculate_fire_intensities(FIRE_DATA['active_fires'])
+        expected = qiskit_model.circuit_template.assign_parameters(
+            qiskit_model._parameter_values(intensities, WEATHER_DATA)
+        )
+        assert qc == expected
+
+    def test_distinct_fires_get_distinct_circuits(self, qiskit_model):
+        moved = {'active_fires': [dict(fire, intensity=0.2) for fire in FIRE_DATA['active_fires']]}
+        assert qiskit_model.build_circuit(FIRE_DATA, WEATHER_DATA) != qiskit_model.build_circuit(moved, WEATHER_DATA)
+        assert qiskit_model.build_circuit({}, WEATHER_DATA) != qiskit_model.build_circuit(FIRE_DATA, WEATHER_DATA)
+
+
+    def test_metadata_counts_the_variational_form_as_one_block(self, qiskit_model):
+        metrics = qiskit_model.trivial_result(WEATHER_DATA)['metadata']['quantum_metrics']
+        assert (metrics['circuit_depth'], metrics['gate_count']) == (15, 54)
+        assert qiskit_model.circuit_template.depth() > metrics['circuit_depth']
+
+EMBER_TYPES = [
+    {'mass': 0.4, 'weight': 0.5},
+    {'mass': 1.5, 'weight': 0.3},
+    {'mass': 4.0, 'weight': 0.2},
+]
+
+
+@pytest.fixture(scope='module')
+def ember_module():
+    pytest.importorskip('classiq')
+    from quantum_models.classiq_models import quantum_random_walk_ember
+    if not quantum_random_walk_ember.NUMBA_AVAILABLE:
+        pytest.skip('numba is not installed')
+    return quantum_random_walk_ember
+
+
+class TestEmberLandingKernel:
+    def _numpy_landing_map(self, walker, wind_field):
+        """Weighted per-type landing maps via the NumPy fallback path"""
+        landing_map = np.zeros((walker.grid_size, walker.grid_size), dtype=np.float32)
+        for ember_type in EMBER_TYPES:
+            result = asyncio.run(walker._execute_quantum_walk(None, ember_type, wind_field, 10))
+            landing_map += result['landing_map'] * np.float32(ember_type['weight'])
+        return landing_map
+
+    @pytest.mark.parametrize('wind', [None, (3.0, -1.5), (5000.0, 5000.0)])
+    def test_kernel_matches_numpy_fallback(self, ember_module, wind):
+        walker = ember_module.QuantumRandomWalkEmber(grid_size=40)
+        wind_field = np.zeros(0) if wind is None else np.broadcast_to(
+            np.array([*wind, 0.0]), (8, 8, 3)).copy()
+
+        expected = self._numpy_landing_map(walker, wind_field)
+        fused = walker._fused_landing_map(EMBER_TYPES, wind_field)
+
+        assert fused.dtype == np.float32
+        np.testing.assert_allclose(fused, expected, rtol=1e-4, atol=1e-7 * np.abs(expected).max())
+
+    def test_strong_wind_exercises_both_normalization_branches(self, ember_module):
+        walker = ember_module.QuantumRandomWalkEmber(grid_size=40)
+        wind_field = np.broadcast_to(np.array([5000.0, 5000.0, 0.0]), (8, 8, 3)).copy()
+        totals = [
+            asyncio.run(walker._execute_quantum_walk(None, ember_type, wind_field, 10))['landing_map'].sum()
+            for ember_type in EMBER_TYPES
+        ]
+        # Light embers still normalize; heavier types sum below zero and are left as is
+        assert totals[0] == pytest.approx(1.0, rel=1e-4)
+        assert min(totals) < 0
+
+
+class TestEnsembleConcurrency:
+    def test_ensemble_runs_across_event_loops(self):
+        from quantum_models.quantum_simulator import QuantumSimulatorManager
+        manager = QuantumSimulatorManager()
+
+        # Each asyncio.run starts a fresh loop; the member semaphore must follow it
+        for _ in range(2):
+            result = asyncio.run(manager.run_ensemble_prediction(FIRE_DATA, WEATHER_DATA))
+            assert result['status'] == 'success'
+            assert result['failed_models'] == 0
+            assert len(result['models']) == 5
+
+    def test_failed_members_report_degraded(self, monkeypatch):
+        from quantum_models.quantum_simulator import QuantumSimulatorManager
+        manager = QuantumSimulatorManager()
+        member = QuantumSimulatorManager._mock_ensemble_member
+
+        def flaky_member(index):
+            if index == 0:
+                raise RuntimeError('member failed')
+            return member(index)
+
+        monkeypatch.setattr(manager, '_mock_ensemble_member', flaky_member)
+        result = asyncio.run(manager.run_ensemble_prediction(FIRE_DATA, WEATHER_DATA))
+
+        assert result['status'] == 'degraded'
+        assert result['failed_models'] == 1
+        assert len(result['models']) == 4
+
+
+@pytest.fixture(scope='module')
+def aer_manager():
+    pytest.importorskip('qiskit_aer')
+    from quantum_models.quantum_simulator import QuantumSimulatorManager
+    manager = QuantumSimulatorManager()
+    asyncio.run(manager.initialize())
+    yield manager
+    asyncio.run(manager.shutdown())
+
+
+class TestQiskitPrediction:
+    def test_initialize_transpiles_the_template(self, aer_manager):
+        model = aer_manager.models['qiskit_fire_spread']
+        assert model._bind_template is not model.circuit_template
+        assert model.build_circuit(FIRE_DATA, WEATHER_DATA).num_parameters == 0
+
+    def test_run_prediction_samples_on_aer(self, aer_manager):
+        result = asyncio.run(aer_manager.run_prediction(FIRE_DATA, WEATHER_DATA, use_hardware=True))
+
+        assert result['status'] == 'success'
+        assert result['metadata']['backend'] == 'aer_simulator'
+        assert result['metadata']['quantum_metrics']['total_shots'] == aer_manager.QISKIT_SHOTS
+        probability_map = result['predictions'][0]['fire_probability_map']
+        assert probability_map.shape == (50, 50)
+        assert probability_map.max() == pytest.approx(1.0)
+
+    def test_unknown_model_reports_error(self, aer_manager):
+        result = asyncio.run(aer_manager.run_prediction(FIRE_DATA, WEATHER_DATA, model_type='classiq_fire_spread'))
+        assert result['status'] == 'error'
+
+    def test_sampled_decode_matches_reference_loop(self, aer_manager):
+        model = aer_manager.models['qiskit_fire_spread']
+        counts = aer_manager._aer_backend.run(model.build_circuit(FIRE_DATA, WEATHER_DATA), shots=2048).result().get_counts()
+
+        prediction = model.process_results(counts, FIRE_DATA, WEATHER_DATA)['predictions'][0]
+        expected = reference_probability_map(model, counts, WEATHER_DATA)
+
+        np.testing.assert_allclose(prediction['fire_probability_map'], expected, atol=1e-5)
+        assert prediction['high_risk_cells'] == [tuple(cell) for cell in np.argwhere(expected > 0.7).tolist()]
+
+    def test_simulator_runs_use_exact_statevector(self, aer_manager):
+        result = asyncio.run(aer_manager.run_prediction(FIRE_DATA, WEATHER_DATA))
+
+        assert result['metadata']['backend'] == 'statevector'
+        assert result['metadata']['quantum_metrics']['total_shots'] == 0
+
+        model = aer_manager.models['qiskit_fire_spread']
+        counts = aer_manager._aer_backend.run(
+            model.build_circuit(FIRE_DATA, WEATHER_DATA), shots=200000, seed_simulator=7
+        ).result().get_counts()
+        sampled = model.process_results(counts, FIRE_DATA, WEATHER_DATA)['predictions'][0]['fire_probability_map']
+        np.testing.assert_allclose(result['predictions'][0]['fire_probability_map'], sampled, atol=0.02)
+
+    @pytest.mark.parametrize('use_hardware', [False, True])
+    def test_no_active_fires_skips_the_circuit(self, aer_manager, monkeypatch, use_hardware):
+        model = aer_manager.models['qiskit_fire_spread']
+
+        def fail(*args, **kwargs):
+            raise AssertionError('circuit should not be simulated')
+
+        monkeypatch.setattr(model, 'build_circuit', fail)
+        monkeypatch.setattr(model, 'process_results_analytic', fail)
+        result = asyncio.run(aer_manager.run_prediction({'active_fires': []}, WEATHER_DATA, use_hardware=use_hardware))
+
+        prediction = result['predictions'][0]
+        assert result['status'] == 'success'
+        assert not prediction['fire_probability_map'].any()
+        assert prediction['high_risk_cells'] == []
+        assert prediction['total_area_at_risk'] == 0.0
+
+    def test_run_scenarios_binds_each_scenario_at_runtime(self, aer_manager):
+        model = aer_manager.models['qiskit_fire_spread']
+        scenarios = [
+            (FIRE_DATA, WEATHER_DATA),
+            ({'active_fires': []}, WEATHER_DATA),
+            (FIRE_DATA, dict(WEATHER_DATA, avg_wind_speed=2, fuel_moisture=40)),
+        ]
+        results = model.run_scenarios(aer_manager._aer_backend, scenarios, shots=100000)
+
+        assert len(results) == len(scenarios)
+        for (fire, weather), result in zip(scenarios, results):
+            exact = model.predict_analytic(fire, weather)['predictions'][0]['fire_probability_map']
+            np.testing.assert_allclose(result['predictions'][0]['fire_probability_map'], exact, atol=0.03)
+
+    def test_ensemble_includes_the_qiskit_weather_member(self, aer_manager):
+        result = asyncio.run(aer_manager.run_ensemble_prediction(FIRE_DATA, WEATHER_DATA))
+
+        assert result['status'] == 'success'
+        qiskit_member = next(m for m in result['models'] if m['model_id'] == 'qiskit_fire_spread')
+        assert qiskit_member['weather_samples'] == aer_manager.ENSEMBLE_WEATHER_SAMPLES
+        assert np.asarray(qiskit_member['prediction_map']).shape == (50, 50)
+
+    def test_run_batch_submits_one_job(self, aer_manager, monkeypatch):
+        model = aer_manager.models['qiskit_fire_spread']
+        backend = aer_manager._aer_backend
+        jobs = []
+        run = backend.run
+
+        def counting_run(*args, **kwargs):
+            jobs.append(kwargs)
+            return run(*args, **kwargs)
+
+        monkeypatch.setattr(backend, 'run', counting_run)
+        weather_list = [dict(WEATHER_DATA, avg_wind_speed=speed) for speed in (5, 15, 25, 35)]
+        results = model.run_batch(backend, FIRE_DATA, weather_list, shots=256)
+
+        assert len(results) == len(weather_list)
+        assert len(jobs) == 1
+        assert jobs[0]['max_parallel_experiments'] == len(weather_list)
+
+    def test_run_batch_splits_jobs_at_the_circuit_cap(self, aer_manager, monkeypatch):
+        model = aer_manager.models['qiskit_fire_spread']
+        backend = aer_manager._aer_backend
+        jobs = []
+        run = backend.run
+
+        def counting_run(*args, **kwargs):
+            jobs.append(kwargs)
+            return run(*args, **kwargs)
+
+        monkeypatch.setattr(backend, 'run', counting_run)
+        monkeypatch.setattr(model, 'MAX_CIRCUITS_PER_JOB', 2)
+        weather_list = [dict(WEATHER_DATA, avg_wind_speed=speed) for speed in (5, 15, 25, 35, 45)]
+        results = model.run_batch(backend, FIRE_DATA, weather_list, shots=100000)
+
+        assert [job['max_parallel_experiments'] for job in jobs] == [2, 2, 1]
+        for weather, result in zip(weather_list, results):
+            exact = model.predict_analytic(FIRE_DATA, weather)['predictions'][0]['fire_probability_map']
+            np.testing.assert_allclose(result['predictions'][0]['fire_probability_map'], exact, atol=0.03)
+
+
+@pytest.fixture
+def automaton_module():
+    from quantum_models.classiq_models import quantum_fire_cellular_automaton
+    return quantum_fire_cellular_automaton
+
+
+def empty_fire_state(module, grid_size):
+    grid = np.zeros((grid_size, grid_size))
+    return module.FireGridState(size=grid_size, cells=grid, wind_field=grid, fuel_moisture=grid,
+                                terrain_elevation=grid, temperature=grid)
+
+
+@pytest.fixture
+def low_thresholds(automaton_module, monkeypatch):
+    # The mock map peaks at 0.5, below the default thresholds
+    monkeypatch.setattr(automaton_module, 'AREA_RISK_THRESHOLD', np.float32(0.2))
+    monkeypatch.setattr(automaton_module, 'HIGH_RISK_THRESHOLD', np.float32(0.3))
+    monkeypatch.setattr(automaton_module, 'CUPY_AVAILABLE', False)
+
+
+def seeded_predict(module, grid_size=40, time_steps=4, seed=11, **kwargs):
+    automaton = module.QuantumFireCellularAutomaton(grid_size=grid_size, **kwargs)
+    automaton._rng = np.random.default_rng(seed)
+    return asyncio.run(automaton.predict(empty_fire_state(module, grid_size), time_steps=time_steps))
+
+
+class TestCellularAutomatonPredict:
+    @pytest.mark.usefixtures('low_thresholds')
+    def test_numba_step_matches_numpy_fallback(self, automaton_module, monkeypatch):
+        if not automaton_module.NUMBA_AVAILABLE:
+            pytest.skip('numba is not installed')
+        fused = seeded_predict(automaton_module)['predictions']
+
+        monkeypatch.setattr(automaton_module, 'NUMBA_AVAILABLE', False)
+        fallback = seeded_predict(automaton_module)['predictions']
+
+        for fused_step, fallback_step in zip(fused, fallback):
+            np.testing.assert_array_equal(fused_step['fire_probability_map'], fallback_step['fire_probability_map'])
+            assert fused_step['high_risk_cells'] == fallback_step['high_risk_cells']
+            assert fused_step['total_area_at_risk'] == fallback_step['total_area_at_risk']
+        assert any(step['high_risk_cells'] for step in fused)
+
+    @pytest.mark.usefixtures('low_thresholds')
+    def test_predict_matches_reference_loop(self, automaton_module):
+        grid_size, time_steps = 40, 3
+        predictions = seeded_predict(automaton_module, grid_size, time_steps)['predictions']
+
+        samples = np.random.default_rng(11).random((time_steps, grid_size, grid_size), dtype=np.float32)
+        center = grid_size // 2
+        for t, step in enumerate(predictions):
+            expected = np.zeros((grid_size, grid_size), dtype=np.float32)
+            high_risk = []
+            for i in range(grid_size):
+                for j in range(grid_size):
+                    decay = np.float32(0.5 * np.exp(-np.sqrt((i - center) ** 2 + (j - center) ** 2) / 10))
+                    expected[i, j] = samples[t, i, j] * decay
+                    if expected[i, j] > 0.3:
+                        high_risk.append((i, j))
+
+            np.testing.assert_allclose(step['fire_probability_map'], expected, rtol=1e-6)
+            assert step['high_risk_cells'] == high_risk
+            assert step['high_risk_cells']
+            assert step['total_area_at_risk'] == float(np.count_nonzero(expected > 0.2))
+
+
+class _DeviceArray(np.ndarray):
+    """Host ndarray standing in for a CuPy device array"""
+
+    def get(self):
+        return np.asarray(self)
+
+
+def cupy_shim(seed):
+    """Minimal NumPy-backed stand-in for the CuPy calls made by _predict_steps_gpu"""
+    def device(array):
+        return np.asarray(array).view(_DeviceArray)
+
+    class Generator:
+        def __init__(self):
+            self._rng = np.random.default_rng(seed)
+
+        def random(self, shape, dtype):
+            return device(self._rng.random(shape, dtype=dtype))
+
+    return types.SimpleNamespace(
+        float32=np.float32,
+        asarray=device,
+        count_nonzero=lambda array, axis=None: device(np.count_nonzero(array, axis=axis)),
+        argwhere=lambda array: device(np.argwhere(array)),
+        random=types.SimpleNamespace(default_rng=Generator),
+    )
+
+
+class TestCellularAutomatonGpuPath:
+    @pytest.mark.usefixtures('low_thresholds')
+    def test_gpu_path_matches_cpu_path(self, automaton_module, monkeypatch):
+        cpu = seeded_predict(automaton_module, grid_size=32)['predictions']
+
+        monkeypatch.setattr(automaton_module, 'CUPY_AVAILABLE', True)
+        monkeypatch.setattr(automaton_module, 'cp', cupy_shim(11), raising=False)
+        gpu = seeded_predict(automaton_module, grid_size=32, gpu_min_grid_size=32)['predictions']
+
+        for cpu_step, gpu_step in zip(cpu, gpu):
+            assert type(gpu_step['fire_probability_map']) is np.ndarray
+            np.testing.assert_array_equal(gpu_step['fire_probability_map'], cpu_step['fire_probability_map'])
+            assert gpu_step['high_risk_cells'] == cpu_step['high_risk_cells']
+            assert gpu_step['total_area_at_risk'] == cpu_step['total_area_at_risk']
+
+    def test_small_grids_stay_on_the_cpu(self, automaton_module, monkeypatch):
+        monkeypatch.setattr(automaton_module, 'CUPY_AVAILABLE', True)
+        monkeypatch.setattr(automaton_module.QuantumFireCellularAutomaton, '_predict_steps_gpu',
+                            lambda *args: pytest.fail('GPU path used below gpu_min_grid_size'))
+        seeded_predict(automaton_module, grid_size=32, gpu_min_grid_size=64)